@@ -7,16 +7,25 @@ while maintaining the complexity and relationships of real banking transactions.
 """
 
 import os
+import io
 import json
+import gzip
 import re
 from pathlib import Path
-from typing import Dict, List, Any, Set
-from datetime import datetime
+from typing import Dict, List, Any, Set, Optional, Iterable, Iterator, Tuple
+from datetime import datetime, date
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import hashlib
-import random
 import uuid
+import zlib
 from dataclasses import dataclass, asdict
-from decimal import Decimal
+
+try:
+    import zstandard
+except ImportError:  # zstd-compressed output is optional
+    zstandard = None
 
 @dataclass
 class TransactionFile:
@@ -27,7 +36,235 @@ class TransactionFile:
     month: int
     day: int
     timestamp: str
+
+# Files handed to a loader process per task, so IPC overhead is amortized
+# over many small files
+LOAD_BATCH_SIZE = 64
+
+# Records anonymized per worker at a time; bounds how much of the dataset is
+# in memory between reading and writing
+ANONYMIZE_CHUNK_SIZE = 256
+
+# Output compression -> file name suffix
+COMPRESSION_SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+def _partitions(directory: str, key: str) -> List[Tuple[str, str]]:
+    """(value, path) of the key=value subdirectories of directory"""
+    prefix = f"{key}="
+    with os.scandir(directory) as entries:
+        return [
+            (entry.name[len(prefix):], entry.path)
+            for entry in entries
+            if entry.name.startswith(prefix) and entry.is_dir()
+        ]
+
+def _numeric_partitions(directory: str, key: str) -> List[Tuple[int, str]]:
+    """Integer-valued partitions in numeric order; malformed names are skipped"""
+    partitions = []
+    for value, path in _partitions(directory, key):
+        try:
+            partitions.append((int(value), path))
+        except ValueError:
+            print(f"Skipping malformed partition: {path}")
+    return sorted(partitions)
+
+def _load_transaction_files(tx_files: List[TransactionFile]) -> List[Optional[Dict[str, Any]]]:
+    """Parse a batch of transaction files (runs in a loader process); None for unreadable files"""
+    loaded = []
+    for tx_file in tx_files:
+        try:
+            with open(tx_file.filepath, 'rb') as f:
+                content = f.read()
+            transaction_data = json.loads(content)
+            
+            # Add file metadata to help with processing; the content hash
+            # lets the manifest tell a rewritten file from a touched one
+            transaction_data['_file_info'] = asdict(tx_file)
+            transaction_data['_file_info']['sha256'] = hashlib.sha256(content).hexdigest()
+            loaded.append(transaction_data)
+            
+        except Exception as e:
+            print(f"Error loading {tx_file.filepath}: {e}")
+            loaded.append(None)
+    return loaded
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write_json_atomic(path: str, obj: Any, **kwargs):
+    """Write JSON to a temporary file and rename it over path, so readers never see a partial file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(obj, f, **kwargs)
+    os.replace(tmp_path, path)
+
+def output_filename(output_format: str, compression: str) -> str:
+    """File name of the anonymized dataset for an output format and compression"""
+    extension = 'json' if output_format == 'json' else 'ndjson'
+    return f"transactions.{extension}{COMPRESSION_SUFFIXES[compression]}"
+
+class RecordWriter:
+    """
+    Writes anonymized records one per line as they are produced, optionally
+    compressed. The json format puts the lines between [ and ], so the file
+    is a JSON array that can still be read back a line at a time; ndjson
+    files can be appended to, each append adding a gzip member or zstd
+    frame.
+    """
+    
+    def __init__(self, path: str, output_format: str, compression: str, append: bool = False):
+        if compression == 'zstd' and zstandard is None:
+            raise RuntimeError("zstd output needs the zstandard package")
+        self.output_format = output_format
+        self.records = 0
+        self._file = open(path, 'ab' if append else 'wb')
+        if compression == 'gzip':
+            # Fixed mtime so identical runs give identical files
+            self._stream = gzip.GzipFile(fileobj=self._file, mode='wb', mtime=0)
+        elif compression == 'zstd':
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._file, closefd=False)
+        else:
+            self._stream = self._file
+        if output_format == 'json':
+            self._stream.write(b'[')
+    
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if self.output_format == 'json':
+            self._stream.write(b',\n' + line if self.records else b'\n' + line)
+        else:
+            self._stream.write(line + b'\n')
+        self.records += 1
+    
+    def close(self):
+        if self.output_format == 'json':
+            self._stream.write(b'\n]\n')
+        if self._stream is not self._file:
+            self._stream.close()
+        self._file.close()
+    
+    def __enter__(self) -> 'RecordWriter':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def iter_output_records(path: str, compression: str) -> Iterator[Dict[str, Any]]:
+    """Read back records written by RecordWriter, one line at a time"""
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Reading zstd output needs the zstandard package")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True)
+    elif compression == 'gzip':
+        raw = gzip.open(path, 'rb')
+    else:
+        raw = open(path, 'rb')
+    
+    with io.TextIOWrapper(raw, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip().rstrip(',')
+            if line and line not in ('[', ']'):
+                yield json.loads(line)
+
+@dataclass
+class ManifestEntry:
+    """A raw file whose record is in the anonymized output"""
+    size: int
+    mtime_ns: int
+    sha256: str
+    record: int  # Index of the file's record in the output dataset
+
+class ProcessingManifest:
+    """
+    Tracks which raw files have been anonymized into the output, so reruns
+    only process new or changed files. Files are keyed by their path
+    relative to the raw transactions directory. The output section records
+    the dataset file's name, format, compression and size as of the last
+    completed run.
+    """
+    
+    VERSION = 2
     
+    def __init__(self, path: str, raw_transactions_dir: str, seed: int):
+        self.path = path
+        self.raw_transactions_dir = raw_transactions_dir
+        self.seed = seed
+        self.files: Dict[str, ManifestEntry] = {}
+        self.output: Dict[str, Any] = {}
+    
+    @classmethod
+    def load(cls, path: str, raw_transactions_dir: str, seed: int) -> 'ProcessingManifest':
+        """The saved manifest, or an empty one if there is none or it was made with another seed"""
+        manifest = cls(path, raw_transactions_dir, seed)
+        if not os.path.exists(path):
+            return manifest
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('version') != cls.VERSION or saved.get('seed') != seed:
+            print(f"Ignoring manifest {path}: written with a different version or seed")
+            return manifest
+        
+        manifest.files = {key: ManifestEntry(**entry) for key, entry in saved['files'].items()}
+        manifest.output = saved.get('output', {})
+        return manifest
+    
+    def save(self):
+        _write_json_atomic(self.path, {
+            'version': self.VERSION,
+            'seed': self.seed,
+            'updated_at': datetime.utcnow().isoformat(),
+            'output': self.output,
+            'files': {key: asdict(entry) for key, entry in sorted(self.files.items())}
+        }, indent=2)
+    
+    def key(self, filepath: str) -> str:
+        return os.path.relpath(filepath, self.raw_transactions_dir)
+    
+    def classify(self, transaction_files: List[TransactionFile]) -> Tuple[List[TransactionFile], Set[str]]:
+        """
+        Split discovered files into those still to process (new or changed)
+        and the keys of manifest entries whose output records are stale
+        (changed or deleted files). Size and mtime are checked first; a
+        file is only rehashed when they differ.
+        """
+        to_process = []
+        stale = set()
+        discovered = set()
+        
+        for tx_file in transaction_files:
+            key = self.key(tx_file.filepath)
+            discovered.add(key)
+            entry = self.files.get(key)
+            if entry is not None:
+                stat = os.stat(tx_file.filepath)
+                if (stat.st_size, stat.st_mtime_ns) == (entry.size, entry.mtime_ns):
+                    continue
+                if stat.st_size == entry.size and _file_sha256(tx_file.filepath) == entry.sha256:
+                    entry.mtime_ns = stat.st_mtime_ns  # Touched but not changed
+                    continue
+                stale.add(key)
+            to_process.append(tx_file)
+        
+        # Files outside the discovered partitions (e.g. pruned by date) are
+        # kept; only files that no longer exist are dropped
+        for key in self.files.keys() - discovered:
+            if not os.path.exists(os.path.join(self.raw_transactions_dir, key)):
+                stale.add(key)
+        
+        return to_process, stale
+    
+    def record(self, file_info: Dict[str, Any], record: int):
+        """Note that a file has been anonymized into the given output record"""
+        stat = os.stat(file_info['filepath'])
+        self.files[self.key(file_info['filepath'])] = ManifestEntry(
+            size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=file_info['sha256'], record=record
+        )
+
 class TransactionParser:
     """Parses and processes raw transaction files"""
     
@@ -36,84 +273,143 @@ class TransactionParser:
         self.transaction_files: List[TransactionFile] = []
         self.all_transactions: List[Dict[str, Any]] = []
         
-    def discover_transaction_files(self) -> List[TransactionFile]:
+    def discover_transaction_files(self, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                                   account_ids: Optional[Iterable[str]] = None) -> List[TransactionFile]:
         """
         Discovers all transaction JSON files in the directory structure.
         Expected structure: raw_transactions/year=YYYY/month=MM/day=DD/account_id=UUID/transactions_TIMESTAMP.json
+        
+        Partitions outside the inclusive date range or account set are pruned
+        without being listed. Files come back in partition order (date,
+        account, file name), so runs over the same tree see the same order.
         """
         print(f"Scanning directory: {self.raw_transactions_dir}")
         
         if not self.raw_transactions_dir.exists():
             raise FileNotFoundError(f"Directory not found: {self.raw_transactions_dir}")
         
+        low = (date_from.year, date_from.month, date_from.day) if date_from else (0, 0, 0)
+        high = (date_to.year, date_to.month, date_to.day) if date_to else (9999, 99, 99)
+        wanted_accounts = set(account_ids) if account_ids is not None else None
+        
         transaction_files = []
         
-        # Walk through the year/month/day/account_id structure
-        for year_dir in self.raw_transactions_dir.glob("year=*"):
-            year = int(year_dir.name.split("=")[1])
+        # Walk through the year/month/day/account_id structure, pruning each
+        # level by comparing the date prefix it fixes against the range
+        for year, year_dir in _numeric_partitions(str(self.raw_transactions_dir), 'year'):
+            if not low[:1] <= (year,) <= high[:1]:
+                continue
             
-            for month_dir in year_dir.glob("month=*"):
-                month = int(month_dir.name.split("=")[1])
+            for month, month_dir in _numeric_partitions(year_dir, 'month'):
+                if not low[:2] <= (year, month) <= high[:2]:
+                    continue
                 
-                for day_dir in month_dir.glob("day=*"):
-                    day = int(day_dir.name.split("=")[1])
+                for day, day_dir in _numeric_partitions(month_dir, 'day'):
+                    if not low <= (year, month, day) <= high:
+                        continue
                     
-                    for account_dir in day_dir.glob("account_id=*"):
-                        account_id = account_dir.name.split("=")[1]
+                    for account_id, account_dir in sorted(_partitions(day_dir, 'account_id')):
+                        if wanted_accounts is not None and account_id not in wanted_accounts:
+                            continue
                         
                         # Find all transaction JSON files in this account directory
-                        for json_file in account_dir.glob("transactions_*.json"):
+                        with os.scandir(account_dir) as entries:
+                            names = sorted(entry.name for entry in entries if entry.is_file())
+                        for name in names:
                             # Extract timestamp from filename
-                            timestamp_match = re.search(r'transactions_(.+)\.json$', json_file.name)
+                            timestamp_match = re.fullmatch(r'transactions_(.+)\.json', name)
                             if timestamp_match:
-                                timestamp = timestamp_match.group(1)
-                                
-                                transaction_file = TransactionFile(
-                                    filepath=str(json_file),
+                                transaction_files.append(TransactionFile(
+                                    filepath=os.path.join(account_dir, name),
                                     account_id=account_id,
                                     year=year,
                                     month=month,
                                     day=day,
-                                    timestamp=timestamp
-                                )
-                                transaction_files.append(transaction_file)
+                                    timestamp=timestamp_match.group(1)
+                                ))
         
         print(f"Found {len(transaction_files)} transaction files")
         self.transaction_files = transaction_files
         return transaction_files
     
-    def load_transaction_data(self) -> List[Dict[str, Any]]:
+    def iter_transaction_data(self, workers: Optional[int] = None,
+                              pool: Optional[ProcessPoolExecutor] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the parsed transaction data of the discovered files, in file
+        order, without holding more than a bounded window of them.
+        
+        Files are parsed in batches by a pool of `workers` processes (default:
+        one per CPU, or the given pool); workers=1 parses in this process.
+        Unreadable files are reported and skipped.
+        """
+        batches = [
+            self.transaction_files[i:i + LOAD_BATCH_SIZE]
+            for i in range(0, len(self.transaction_files), LOAD_BATCH_SIZE)
+        ]
+        
+        if workers == 1 or len(batches) <= 1:
+            for batch in batches:
+                yield from filter(None, _load_transaction_files(batch))
+            return
+        
+        workers = workers or os.cpu_count() or 1
+        if pool is None:
+            with ProcessPoolExecutor(max_workers=workers) as own_pool:
+                yield from self.iter_transaction_data(workers, own_pool)
+            return
+        
+        # Keep a few batches per worker in flight; submitting everything
+        # up front would buffer the whole dataset if the consumer is slow
+        window = 4 * workers
+        pending = deque()
+        batch_iter = iter(batches)
+        for batch in batch_iter:
+            pending.append(pool.submit(_load_transaction_files, batch))
+            if len(pending) >= window:
+                break
+        
+        while pending:
+            loaded = pending.popleft().result()
+            next_batch = next(batch_iter, None)
+            if next_batch is not None:
+                pending.append(pool.submit(_load_transaction_files, next_batch))
+            yield from filter(None, loaded)
+    
+    def load_transaction_data(self, workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Loads all transaction data from discovered files.
         Returns list of raw transaction objects.
         """
-        all_transactions = []
-        
-        for tx_file in self.transaction_files:
-            try:
-                with open(tx_file.filepath, 'r', encoding='utf-8') as f:
-                    transaction_data = json.load(f)
-                    
-                    # Add file metadata to help with processing
-                    transaction_data['_file_info'] = asdict(tx_file)
-                    all_transactions.append(transaction_data)
-                    
-            except Exception as e:
-                print(f"Error loading {tx_file.filepath}: {e}")
-                continue
+        all_transactions = list(self.iter_transaction_data(workers))
         
         print(f"Loaded {len(all_transactions)} transaction records")
         self.all_transactions = all_transactions
         return all_transactions
     
-    def analyze_data_structure(self) -> Dict[str, Any]:
+    def analyze_data_structure(self, transactions: Optional[Iterable[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Analyzes the structure and content of transaction data to understand
         what needs to be anonymized and what patterns exist.
+        
+        Runs over the given transactions (default: the loaded ones) in one
+        pass; new_analysis/add_to_analysis/finish_analysis do the same
+        piecemeal for callers that stream records.
         """
-        analysis = {
+        analysis = self.new_analysis()
+        for tx_data in (self.all_transactions if transactions is None else transactions):
+            self.add_to_analysis(tx_data, analysis)
+        return self.finish_analysis(analysis)
+    
+    def new_analysis(self) -> Dict[str, Any]:
+        """Empty analysis to feed records into with add_to_analysis"""
+        # Per account and status: transaction key -> the createdAt of every
+        # record it appears in, plus its place in chronological order
+        self._relationships: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        self._sequence = 0
+        
+        return {
             'total_files': len(self.transaction_files),
-            'total_transactions': len(self.all_transactions),
+            'total_transactions': 0,
             'account_ids': set(),
             'date_range': {'min': None, 'max': None},
             'transaction_types': set(),
@@ -126,121 +422,112 @@ class TransactionParser:
             'state_transitions': {'pending_to_booked': [], 'duplicates': []},
             'transaction_relationships': {}
         }
+    
+    def add_to_analysis(self, tx_data: Dict[str, Any], analysis: Dict[str, Any]):
+        """Fold one transaction record into the analysis"""
+        analysis['total_transactions'] += 1
         
-        for tx_data in self.all_transactions:
-            # Account IDs
-            account_id = tx_data['metadata']['accountId']
-            analysis['account_ids'].add(account_id)
-            
-            # Date range
-            created_at = tx_data['metadata']['createdAt']
-            if analysis['date_range']['min'] is None or created_at < analysis['date_range']['min']:
-                analysis['date_range']['min'] = created_at
-            if analysis['date_range']['max'] is None or created_at > analysis['date_range']['max']:
-                analysis['date_range']['max'] = created_at
-            
-            # Analyze payload
-            payload = tx_data['payload']
-            
-            # Pending transactions
-            for pending_tx in payload.get('pending', []):
-                analysis['pending_vs_booked']['pending'] += 1
-                self._analyze_transaction(pending_tx, analysis)
-            
-            # Booked transactions  
-            for booked_tx in payload.get('booked', []):
-                analysis['pending_vs_booked']['booked'] += 1
-                self._analyze_transaction(booked_tx, analysis)
-            
-            # Keep some samples for reference
-            if len(analysis['sample_transactions']) < 5:
-                analysis['sample_transactions'].append(tx_data)
+        # Account IDs
+        account_id = tx_data['metadata']['accountId']
+        analysis['account_ids'].add(account_id)
+        
+        # Date range
+        created_at = tx_data['metadata']['createdAt']
+        if analysis['date_range']['min'] is None or created_at < analysis['date_range']['min']:
+            analysis['date_range']['min'] = created_at
+        if analysis['date_range']['max'] is None or created_at > analysis['date_range']['max']:
+            analysis['date_range']['max'] = created_at
+        
+        # Analyze payload
+        payload = tx_data['payload']
+        
+        # Pending transactions
+        for pending_tx in payload.get('pending', []):
+            analysis['pending_vs_booked']['pending'] += 1
+            self._analyze_transaction(pending_tx, analysis)
         
+        # Booked transactions  
+        for booked_tx in payload.get('booked', []):
+            analysis['pending_vs_booked']['booked'] += 1
+            self._analyze_transaction(booked_tx, analysis)
+        
+        # Keep some samples for reference
+        if len(analysis['sample_transactions']) < 5:
+            analysis['sample_transactions'].append(tx_data)
+        
+        self._track_relationships(tx_data)
+    
+    def finish_analysis(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Complete the analysis once every record has been added"""
         # Analyze transaction relationships and state transitions
         self._analyze_transaction_relationships(analysis)
         
-        # Convert sets to lists for JSON serialization
-        analysis['account_ids'] = list(analysis['account_ids'])
-        analysis['transaction_types'] = list(analysis['transaction_types'])
-        analysis['creditor_names'] = list(analysis['creditor_names'])
-        analysis['currencies'] = list(analysis['currencies'])
-        analysis['transaction_id_patterns'] = list(analysis['transaction_id_patterns'])
+        # Convert sets to sorted lists for JSON serialization, so reruns over
+        # the same files produce the same analysis
+        analysis['account_ids'] = sorted(analysis['account_ids'])
+        analysis['transaction_types'] = sorted(analysis['transaction_types'])
+        analysis['creditor_names'] = sorted(analysis['creditor_names'])
+        analysis['currencies'] = sorted(analysis['currencies'])
+        analysis['transaction_id_patterns'] = sorted(analysis['transaction_id_patterns'])
         
         return analysis
     
+    def _track_relationships(self, tx_data: Dict[str, Any]):
+        """Record when each transaction key of a record was seen, for the relationship analysis"""
+        account = self._relationships.setdefault(tx_data['metadata']['accountId'], {'pending': {}, 'booked': {}})
+        timestamp = tx_data['metadata']['createdAt']
+        
+        for status in ('pending', 'booked'):
+            for transaction in tx_data['payload'].get(status, []):
+                tx_key = self._create_transaction_key(transaction)
+                seen = account[status].get(tx_key)
+                if seen is None:
+                    seen = account[status][tx_key] = {'timestamps': [], 'order': (timestamp, self._sequence)}
+                elif timestamp < seen['order'][0]:
+                    # First appearance in chronological order, ties going
+                    # to the record read first
+                    seen['order'] = (timestamp, self._sequence)
+                seen['timestamps'].append(timestamp)
+                self._sequence += 1
+    
     def _analyze_transaction_relationships(self, analysis: Dict[str, Any]):
         """Analyze relationships between transactions (pending → booked, duplicates)"""
-        # Group transactions by account and analyze patterns
-        transactions_by_account = {}
-        
-        for tx_data in self.all_transactions:
-            account_id = tx_data['metadata']['accountId']
-            if account_id not in transactions_by_account:
-                transactions_by_account[account_id] = []
-            transactions_by_account[account_id].append(tx_data)
-        
         # For each account, look for state transitions and duplicates
-        for account_id, account_transactions in transactions_by_account.items():
-            # Sort by timestamp to understand chronology
-            account_transactions.sort(key=lambda x: x['metadata']['createdAt'])
-            
-            # Track all transactions by ID and characteristics
-            pending_transactions = {}
-            booked_transactions = {}
-            
-            for tx_data in account_transactions:
-                payload = tx_data['payload']
-                
-                # Collect pending transactions
-                for pending_tx in payload.get('pending', []):
-                    tx_key = self._create_transaction_key(pending_tx)
-                    if tx_key not in pending_transactions:
-                        pending_transactions[tx_key] = []
-                    pending_transactions[tx_key].append({
-                        'transaction': pending_tx,
-                        'timestamp': tx_data['metadata']['createdAt'],
-                        'file_info': tx_data.get('_file_info', {})
-                    })
-                
-                # Collect booked transactions
-                for booked_tx in payload.get('booked', []):
-                    tx_key = self._create_transaction_key(booked_tx)
-                    if tx_key not in booked_transactions:
-                        booked_transactions[tx_key] = []
-                    booked_transactions[tx_key].append({
-                        'transaction': booked_tx,
-                        'timestamp': tx_data['metadata']['createdAt'],
-                        'file_info': tx_data.get('_file_info', {})
-                    })
+        for account_id, account in self._relationships.items():
+            # Keys in the order they first appear chronologically
+            pending_transactions = dict(sorted(account['pending'].items(), key=lambda item: item[1]['order']))
+            booked_transactions = dict(sorted(account['booked'].items(), key=lambda item: item[1]['order']))
             
             # Look for pending → booked transitions
-            for tx_key, pending_list in pending_transactions.items():
+            for tx_key, pending_seen in pending_transactions.items():
                 if tx_key in booked_transactions:
-                    booked_list = booked_transactions[tx_key]
+                    booked_seen = booked_transactions[tx_key]
                     
                     # Found potential state transition
-                    earliest_pending = min(pending_list, key=lambda x: x['timestamp'])
-                    earliest_booked = min(booked_list, key=lambda x: x['timestamp'])
+                    earliest_pending = min(pending_seen['timestamps'])
+                    earliest_booked = min(booked_seen['timestamps'])
                     
-                    if earliest_pending['timestamp'] <= earliest_booked['timestamp']:
+                    if earliest_pending <= earliest_booked:
                         analysis['state_transitions']['pending_to_booked'].append({
                             'account_id': account_id,
                             'transaction_key': tx_key,
-                            'pending_first_seen': earliest_pending['timestamp'],
-                            'booked_first_seen': earliest_booked['timestamp'],
-                            'pending_count': len(pending_list),
-                            'booked_count': len(booked_list)
+                            'pending_first_seen': earliest_pending,
+                            'booked_first_seen': earliest_booked,
+                            'pending_count': len(pending_seen['timestamps']),
+                            'booked_count': len(booked_seen['timestamps'])
                         })
             
             # Look for duplicates (same transaction appearing multiple times)
-            for tx_key, tx_list in {**pending_transactions, **booked_transactions}.items():
-                if len(tx_list) > 1:
+            for tx_key, seen in {**pending_transactions, **booked_transactions}.items():
+                if len(seen['timestamps']) > 1:
                     analysis['state_transitions']['duplicates'].append({
                         'account_id': account_id,
                         'transaction_key': tx_key,
-                        'occurrence_count': len(tx_list),
-                        'timestamps': [tx['timestamp'] for tx in tx_list]
+                        'occurrence_count': len(seen['timestamps']),
+                        'timestamps': sorted(seen['timestamps'])
                     })
+        
+        self._relationships = {}
     
     def _create_transaction_key(self, transaction: Dict[str, Any]) -> str:
         """Create a unique key for a transaction based on its characteristics"""
@@ -302,11 +589,20 @@ class TransactionParser:
             analysis['transaction_id_patterns'].add(pattern)
 
 class TransactionAnonymizer:
-    """Handles anonymization of sensitive transaction data"""
+    """
+    Handles anonymization of sensitive transaction data.
+    
+    Every substitution is a pure function of its input: the seed only feeds
+    seeded_uuid() (requisition and trace IDs), while account IDs, names,
+    references and amounts are hashed from the original value alone. So
+    anonymizers with the same seed agree without sharing state; the mapping
+    dicts are only caches of those functions (and the source of the stats),
+    which is what lets shards of the data be anonymized in parallel.
+    """
     
     def __init__(self, seed: int = 42):
         """Initialize with deterministic seed for consistent anonymization"""
-        random.seed(seed)
+        self.seed = seed
         
         # Mapping caches for consistent anonymization
         self.account_id_map = {}
@@ -353,6 +649,23 @@ class TransactionAnonymizer:
             "LEE", "MARTIN", "CLARKE", "JAMES", "MORGAN", "HUGHES", "EDWARDS", "HILL"
         ]
     
+    # Mappings persisted between incremental runs
+    STATE_MAPS = ('account_id_map', 'creditor_name_map', 'reference_map', 'transaction_id_map', 'transaction_key_map')
+    
+    def get_state(self) -> Dict[str, Dict[str, str]]:
+        """The mapping caches, for saving between runs"""
+        return {name: getattr(self, name) for name in self.STATE_MAPS}
+    
+    def load_state(self, state: Dict[str, Dict[str, str]]):
+        """Merge in caches from get_state(), saved by an earlier run or returned by a shard"""
+        for name in self.STATE_MAPS:
+            getattr(self, name).update(state.get(name, {}))
+    
+    def seeded_uuid(self, field: str, original: str) -> str:
+        """Random-looking UUID4 derived from the seed, the field name and the original value"""
+        digest = hashlib.md5(f"{self.seed}:{field}:{original}".encode()).digest()
+        return str(uuid.UUID(bytes=digest, version=4))
+    
     def anonymize_account_id(self, original_id: str) -> str:
         """Convert account ID to consistent fake UUID"""
         if original_id not in self.account_id_map:
@@ -499,10 +812,12 @@ class TransactionAnonymizer:
             )
         
         # Anonymize amounts with small variance
+        # (copied first: the shallow copy above still shares the original's dict)
         if 'transactionAmount' in anonymized and 'amount' in anonymized['transactionAmount']:
-            anonymized['transactionAmount']['amount'] = self.anonymize_amount(
-                anonymized['transactionAmount']['amount']
-            )
+            anonymized['transactionAmount'] = {
+                **anonymized['transactionAmount'],
+                'amount': self.anonymize_amount(anonymized['transactionAmount']['amount'])
+            }
         
         # Anonymize internal transaction ID
         if 'internalTransactionId' in anonymized:
@@ -557,11 +872,11 @@ class TransactionAnonymizer:
             
             # Anonymize requisition ID
             if 'requisitionId' in metadata:
-                metadata['requisitionId'] = str(uuid.uuid4())
+                metadata['requisitionId'] = self.seeded_uuid('requisitionId', str(metadata['requisitionId']))
             
             # Anonymize trace ID  
             if 'traceId' in metadata:
-                metadata['traceId'] = str(uuid.uuid4())
+                metadata['traceId'] = self.seeded_uuid('traceId', str(metadata['traceId']))
             
             anonymized['metadata'] = metadata
         
@@ -585,49 +900,195 @@ class TransactionAnonymizer:
         
         return anonymized
 
-def process_and_anonymize_data():
-    """Complete data processing and anonymization workflow"""
+def _anonymize_shard(seed: int, records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, str]]]:
+    """Anonymize one shard of records (runs in a worker process); returns the records and the shard's caches"""
+    anonymizer = TransactionAnonymizer(seed=seed)
+    return [anonymizer.anonymize_transaction_file(record) for record in records], anonymizer.get_state()
+
+def anonymize_records(anonymizer: TransactionAnonymizer, records: List[Dict[str, Any]],
+                      workers: Optional[int] = None,
+                      pool: Optional[ProcessPoolExecutor] = None) -> List[Dict[str, Any]]:
+    """
+    Anonymize records in order. With more than one worker, records are
+    sharded by account across a process pool (the given one, or one started
+    for the call), each shard using a fresh anonymizer with the same seed;
+    since every mapping depends only on its input (and, for seeded_uuid(),
+    the seed), the output is identical to a serial run. The shards' caches are merged into anonymizer
+    afterwards so its stats cover them.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(records) < 2 * LOAD_BATCH_SIZE:
+        return [anonymizer.anonymize_transaction_file(record) for record in records]
+    if pool is None:
+        with ProcessPoolExecutor(max_workers=workers) as own_pool:
+            return anonymize_records(anonymizer, records, workers, own_pool)
+    
+    # Several shards per worker evens out accounts of different sizes; the
+    # shard of an account only depends on its ID
+    shard_count = workers * 4
+    shards: List[List[int]] = [[] for _ in range(shard_count)]
+    for i, record in enumerate(records):
+        account_id = record.get('metadata', {}).get('accountId', '')
+        shards[zlib.crc32(account_id.encode()) % shard_count].append(i)
+    
+    anonymized: List[Optional[Dict[str, Any]]] = [None] * len(records)
+    futures = {
+        pool.submit(_anonymize_shard, anonymizer.seed, [records[i] for i in indexes]): indexes
+        for indexes in shards if indexes
+    }
+    for future in as_completed(futures):
+        shard_records, state = future.result()
+        for i, record in zip(futures[future], shard_records):
+            anonymized[i] = record
+        anonymizer.load_state(state)
+    return anonymized
+
+def process_and_anonymize_data(raw_transactions_dir: str = "raw_transactions", date_from: Optional[date] = None,
+                               date_to: Optional[date] = None, account_ids: Optional[List[str]] = None,
+                               workers: Optional[int] = None, output_dir: str = "data", full: bool = False,
+                               output_format: str = "json", compression: str = "none"):
+    """
+    Complete data processing and anonymization workflow.
+    
+    Records stream from the raw files through the anonymizer into the
+    output file a chunk at a time, so memory use does not grow with the
+    dataset. The output is a JSON array or NDJSON with one record per line,
+    optionally gzip or zstd compressed.
+    
+    Runs incrementally when a manifest from an earlier run exists: only new
+    or changed raw files are anonymized, records of changed or deleted files
+    are replaced, and the anonymizer's mappings carry over. full=True
+    reprocesses everything. Returns the dataset path and the analysis of
+    the files processed.
+    """
     print("=== Transaction Data Processing & Anonymization ===")
     
-    # Step 1: Parse and analyze
-    parser = TransactionParser()
-    transaction_files = parser.discover_transaction_files()
-    all_transactions = parser.load_transaction_data()
-    analysis = parser.analyze_data_structure()
+    seed = 42
+    os.makedirs(output_dir, exist_ok=True)
+    output_name = output_filename(output_format, compression)
+    output_path = os.path.join(output_dir, output_name)
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    state_path = os.path.join(output_dir, 'anonymizer_state.json')
+    mappings_path = os.path.join(output_dir, 'anonymization_mappings.json')
     
-    print(f"Loaded {len(all_transactions)} transaction records from {len(transaction_files)} files")
-    print(f"Covering {len(analysis['account_ids'])} unique accounts")
+    manifest = ProcessingManifest(manifest_path, raw_transactions_dir, seed)
+    if not full and os.path.exists(state_path):
+        manifest = ProcessingManifest.load(manifest_path, raw_transactions_dir, seed)
+        if manifest.files and (manifest.output.get('path') != output_name or not os.path.exists(output_path)
+                               or os.path.getsize(output_path) < manifest.output.get('bytes', 0)):
+            print(f"No complete {output_name} from an earlier run, reprocessing every file")
+            manifest = ProcessingManifest(manifest_path, raw_transactions_dir, seed)
+    incremental = bool(manifest.files)
+    
+    # Step 1: Find the files to process
+    parser = TransactionParser(raw_transactions_dir)
+    transaction_files = parser.discover_transaction_files(date_from, date_to, account_ids)
+    parser.transaction_files, stale = manifest.classify(transaction_files)
     
-    # Step 2: Anonymize data
+    if incremental:
+        print(f"Incremental run: {len(parser.transaction_files)} new or changed files, "
+              f"{len(stale)} stale records, {len(manifest.files) - len(stale)} records kept")
+        if not parser.transaction_files and not stale:
+            manifest.save()  # Keep refreshed mtimes of touched files
+            print("Nothing to do, output is up to date")
+            return output_path, None
+    
+    # Step 2: Stream records through analysis and anonymization into the output
     print("\n=== Anonymizing Transaction Data ===")
-    anonymizer = TransactionAnonymizer(seed=42)
+    anonymizer = TransactionAnonymizer(seed=seed)
+    if incremental:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            anonymizer.load_state(json.load(f))
+    for key in stale:
+        del manifest.files[key]
     
-    anonymized_transactions = []
-    for i, tx_data in enumerate(all_transactions):
-        if i % 500 == 0:
-            print(f"Processed {i}/{len(all_transactions)} transactions...")
-        
-        # Remove file info before anonymization
-        clean_tx_data = {k: v for k, v in tx_data.items() if k != '_file_info'}
-        anonymized_tx = anonymizer.anonymize_transaction_file(clean_tx_data)
-        anonymized_transactions.append(anonymized_tx)
+    # NDJSON without stale records is appended to in place; otherwise the
+    # kept records are copied into a new file that replaces the old one
+    append = incremental and not stale and output_format == 'ndjson'
+    write_path = output_path if append else f"{output_path}.tmp"
+    if append:
+        # Drop anything a run that died before saving its manifest appended
+        with open(output_path, 'r+b') as f:
+            f.truncate(manifest.output['bytes'])
     
-    print(f"Anonymized {len(anonymized_transactions)} transaction records")
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    analysis = parser.new_analysis()
+    processed = 0
+    try:
+        with RecordWriter(write_path, output_format, compression, append=append) as writer:
+            if append:
+                writer.records = manifest.output['records']
+            elif incremental:
+                # Keep the records of unchanged files, renumbering their manifest entries
+                kept = {entry.record: entry for entry in manifest.files.values()}
+                for index, record in enumerate(iter_output_records(output_path, compression)):
+                    entry = kept.get(index)
+                    if entry is not None:
+                        entry.record = writer.records
+                        writer.write(record)
+            
+            records = parser.iter_transaction_data(workers, pool)
+            while True:
+                chunk = list(islice(records, workers * ANONYMIZE_CHUNK_SIZE))
+                if not chunk:
+                    break
+                for tx_data in chunk:
+                    parser.add_to_analysis(tx_data, analysis)
+                
+                # Remove file info before anonymization
+                clean_transactions = [{k: v for k, v in tx_data.items() if k != '_file_info'} for tx_data in chunk]
+                for tx_data, anonymized_tx in zip(chunk, anonymize_records(anonymizer, clean_transactions, workers, pool)):
+                    manifest.record(tx_data['_file_info'], writer.records)
+                    writer.write(anonymized_tx)
+                
+                processed += len(chunk)
+                print(f"Processed {processed}/{len(parser.transaction_files)} transactions...")
+    finally:
+        if pool is not None:
+            pool.shutdown()
     
-    # Step 3: Save anonymized data
-    os.makedirs('data', exist_ok=True)
+    analysis = parser.finish_analysis(analysis)
+    print(f"Anonymized {processed} transaction records ({writer.records} in dataset)")
+    print(f"Covering {len(analysis['account_ids'])} unique accounts")
+    
+    # Step 3: Save the dataset, mappings and manifest
+    # The manifest goes last: if the run dies before it is written, the next
+    # run redoes this one's files rather than skipping them
+    if not append:
+        os.replace(write_path, output_path)
+    _write_json_atomic(state_path, anonymizer.get_state(), ensure_ascii=False, sort_keys=True)
+    manifest.output = {
+        'path': output_name,
+        'format': output_format,
+        'compression': compression,
+        'bytes': os.path.getsize(output_path),
+        'records': writer.records
+    }
+    manifest.save()
     
-    # Save complete anonymized dataset
-    with open('data/transactions.json', 'w') as f:
-        json.dump(anonymized_transactions, f, indent=2, ensure_ascii=False)
+    # Save analysis for reference; an incremental run only saw its own files,
+    # so the full analysis from the last complete run is left in place
+    if not incremental:
+        with open(os.path.join(output_dir, 'analysis.json'), 'w') as f:
+            json.dump(analysis, f, indent=2, ensure_ascii=False)
     
-    # Save analysis for reference
-    with open('data/analysis.json', 'w') as f:
-        json.dump(analysis, f, indent=2, ensure_ascii=False)
+    relationship_analysis = {
+        'pending_to_booked_transitions': len(analysis.get('state_transitions', {}).get('pending_to_booked', [])),
+        'duplicate_transactions': len(analysis.get('state_transitions', {}).get('duplicates', [])),
+        'total_unique_transaction_keys': len(set(anonymizer.transaction_key_map.keys()))
+    }
+    if incremental and os.path.exists(mappings_path):
+        # Transitions spanning old and new files can't be seen from this
+        # run's files alone, so keep the counts of the last full run
+        with open(mappings_path, 'r', encoding='utf-8') as f:
+            previous_relationships = json.load(f).get('relationship_analysis', {})
+        for key in ('pending_to_booked_transitions', 'duplicate_transactions'):
+            relationship_analysis[key] = previous_relationships.get(key, 0)
     
     # Save anonymization mappings for debugging
     mappings = {
-        'account_id_map': anonymizer.account_id_map,
+        'account_id_map': dict(sorted(anonymizer.account_id_map.items())),
         'anonymization_stats': {
             'accounts_anonymized': len(anonymizer.account_id_map),
             'creditors_anonymized': len(anonymizer.creditor_name_map),
@@ -635,20 +1096,18 @@ def process_and_anonymize_data():
             'transaction_ids_anonymized': len(anonymizer.transaction_id_map),
             'transaction_relationships_preserved': len(anonymizer.transaction_key_map)
         },
-        'relationship_analysis': {
-            'pending_to_booked_transitions': len(analysis.get('state_transitions', {}).get('pending_to_booked', [])),
-            'duplicate_transactions': len(analysis.get('state_transitions', {}).get('duplicates', [])),
-            'total_unique_transaction_keys': len(set(anonymizer.transaction_key_map.keys()))
-        }
+        'relationship_analysis': relationship_analysis
     }
     
-    with open('data/anonymization_mappings.json', 'w') as f:
+    with open(mappings_path, 'w') as f:
         json.dump(mappings, f, indent=2, ensure_ascii=False)
     
     print(f"\n=== Anonymization Complete ===")
-    print(f"✅ Created anonymized dataset: data/transactions.json")
-    print(f"✅ Original analysis saved: data/analysis.json") 
-    print(f"✅ Anonymization mappings: data/anonymization_mappings.json")
+    print(f"✅ Created anonymized dataset: {output_path}")
+    if not incremental:
+        print(f"✅ Original analysis saved: {output_dir}/analysis.json")
+    print(f"✅ Anonymization mappings: {mappings_path}")
+    print(f"✅ Processing manifest: {manifest_path}")
     print(f"\nAnonymization Statistics:")
     print(f"  - {mappings['anonymization_stats']['accounts_anonymized']} account IDs anonymized")
     print(f"  - {mappings['anonymization_stats']['creditors_anonymized']} creditor names anonymized")
@@ -660,27 +1119,40 @@ def process_and_anonymize_data():
     print(f"  - {mappings['relationship_analysis']['duplicate_transactions']} duplicate transaction patterns found")
     print(f"  - {mappings['relationship_analysis']['total_unique_transaction_keys']} unique transaction signatures")
     
-    # Create sample for testing
-    sample_size = min(50, len(anonymized_transactions))
-    sample_transactions = anonymized_transactions[:sample_size]
+    # Create sample for testing from the head of the dataset
+    sample_transactions = list(islice(iter_output_records(output_path, compression), 50))
     
-    with open('data/transactions_sample.json', 'w') as f:
+    with open(os.path.join(output_dir, 'transactions_sample.json'), 'w') as f:
         json.dump(sample_transactions, f, indent=2, ensure_ascii=False)
     
-    print(f"✅ Sample dataset created: data/transactions_sample.json ({sample_size} records)")
+    print(f"✅ Sample dataset created: {output_dir}/transactions_sample.json ({len(sample_transactions)} records)")
     
-    return anonymized_transactions, analysis
+    return output_path, analysis
 
 def main():
     """Main function with choice of analysis or full processing"""
-    import sys
+    import argparse
+    
+    arg_parser = argparse.ArgumentParser(description="Parse and anonymize raw transaction files")
+    arg_parser.add_argument('--analyze-only', action='store_true', help="Print the data analysis without anonymizing")
+    arg_parser.add_argument('--raw-dir', default='raw_transactions', help="Root of the year=/month=/day=/account_id= tree")
+    arg_parser.add_argument('--date-from', type=date.fromisoformat, help="First partition date to include (YYYY-MM-DD)")
+    arg_parser.add_argument('--date-to', type=date.fromisoformat, help="Last partition date to include (YYYY-MM-DD)")
+    arg_parser.add_argument('--account', action='append', dest='accounts', help="Only this raw account ID (repeatable)")
+    arg_parser.add_argument('--workers', type=int, help="Loader and anonymizer processes (default: one per CPU, 1 to run serially)")
+    arg_parser.add_argument('--output-dir', default='data', help="Where the dataset, manifest and mappings are written")
+    arg_parser.add_argument('--full', action='store_true', help="Reprocess every file instead of only new or changed ones")
+    arg_parser.add_argument('--format', choices=('json', 'ndjson'), default='json',
+                            help="Dataset layout: a JSON array (transactions.json) or NDJSON (transactions.ndjson)")
+    arg_parser.add_argument('--compression', choices=sorted(COMPRESSION_SUFFIXES), default='none',
+                            help="Compress the dataset with gzip (.gz) or zstd (.zst, needs zstandard)")
+    args = arg_parser.parse_args()
     
-    if len(sys.argv) > 1 and sys.argv[1] == '--analyze-only':
+    if args.analyze_only:
         # Just run analysis
-        parser = TransactionParser()
-        transaction_files = parser.discover_transaction_files()
-        all_transactions = parser.load_transaction_data()
-        analysis = parser.analyze_data_structure()
+        parser = TransactionParser(args.raw_dir)
+        transaction_files = parser.discover_transaction_files(args.date_from, args.date_to, args.accounts)
+        analysis = parser.analyze_data_structure(parser.iter_transaction_data(args.workers))
         
         print(f"\n=== Data Analysis ===")
         print(f"Total Files: {analysis['total_files']}")
@@ -695,7 +1167,10 @@ def main():
         print(f"Unique Merchants: {len(analysis['creditor_names'])} merchants")
     else:
         # Run full processing and anonymization
-        process_and_anonymize_data()
+        process_and_anonymize_data(
+            args.raw_dir, args.date_from, args.date_to, args.accounts, args.workers, args.output_dir, args.full,
+            args.format, args.compression
+        )
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Fixtures: a small raw_transactions tree in the year=/month=/day=/account_id= layout"""
+
+import os
+import sys
+import json
+from typing import Any, Callable, Dict
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _raw_record(account_id: str, created_at: str, index: int) -> Dict[str, Any]:
+    return {
+        'metadata': {
+            'accountId': account_id,
+            'requisitionId': f"req-{account_id}",
+            'createdAt': created_at,
+            'traceId': f"trace-{account_id}-{index}"
+        },
+        'payload': {
+            'pending': [{
+                'bookingDate': created_at[:10],
+                'transactionAmount': {'amount': f"-{index + 1}.25", 'currency': 'GBP'},
+                'remittanceInformationUnstructured': f"CARD {index:06d}",
+                'proprietaryBankTransactionCode': 'POS'
+            }],
+            'booked': [{
+                'transactionId': f"tx-{account_id}-{index}",
+                'bookingDate': created_at[:10],
+                'transactionAmount': {'amount': f"{(index + 1) * 10}.00", 'currency': 'GBP'},
+                'creditorName': f"Merchant {index % 3}",
+                'remittanceInformationUnstructured': f"INV{index:08d}",
+                'internalTransactionId': f"internal-{account_id}-{index}",
+                'proprietaryBankTransactionCode': 'BAC'
+            }]
+        }
+    }
+
+def _add_raw_file(raw_dir: str, account_id: str, created_at: str, index: int) -> str:
+    """Write one raw file under its date and account partition; returns its path"""
+    partition = os.path.join(
+        raw_dir, f"year={created_at[:4]}", f"month={created_at[5:7]}", f"day={created_at[8:10]}",
+        f"account_id={account_id}"
+    )
+    os.makedirs(partition, exist_ok=True)
+    path = os.path.join(partition, f"transactions_{created_at.replace(':', '')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(_raw_record(account_id, created_at, index), f)
+    return path
+
+@pytest.fixture
+def add_raw_file() -> Callable[..., str]:
+    return _add_raw_file
+
+@pytest.fixture
+def raw_dir(tmp_path) -> str:
+    """Six raw files over three accounts and two days"""
+    root = str(tmp_path / 'raw_transactions')
+    index = 0
+    for day in ('01', '02'):
+        for account_id in ('acc-1', 'acc-2', 'acc-3'):
+            _add_raw_file(root, account_id, f"2025-07-{day}T0{index % 10}:00:00.000Z", index)
+            index += 1
+    return root
@@ -0,0 +1,177 @@
+"""Streaming output, incremental reruns and serial/parallel equivalence of the anonymizer"""
+
+import os
+import gzip
+import json
+
+import pytest
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from anonymize_data import RecordWriter, iter_output_records, output_filename, process_and_anonymize_data
+
+def run(raw_dir, output_dir, **kwargs):
+    kwargs.setdefault('workers', 1)
+    return process_and_anonymize_data(str(raw_dir), output_dir=str(output_dir), **kwargs)
+
+def read_manifest(output_dir):
+    with open(os.path.join(output_dir, 'manifest.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def records_by_trace(path, compression='none'):
+    return {record['metadata']['traceId']: record for record in iter_output_records(path, compression)}
+
+def decompressed(path, compression):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    if compression == 'zstd':
+        return zstandard.ZstdDecompressor().stream_reader(data, read_across_frames=True).read()
+    return data
+
+COMPRESSIONS = ['none', 'gzip', pytest.param('zstd', marks=pytest.mark.skipif(zstandard is None, reason='needs zstandard'))]
+
+@pytest.mark.parametrize('output_format', ['json', 'ndjson'])
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+def test_record_writer_round_trip(tmp_path, output_format, compression):
+    records = [{'id': i, 'name': 'Café ü'} for i in range(5)]
+    path = str(tmp_path / output_filename(output_format, compression))
+
+    with RecordWriter(path, output_format, compression) as writer:
+        for record in records:
+            writer.write(record)
+
+    assert writer.records == 5
+    assert list(iter_output_records(path, compression)) == records
+    if output_format == 'json':
+        assert json.loads(decompressed(path, compression)) == records
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+def test_appended_ndjson_decompresses_to_single_write(tmp_path, compression):
+    records = [{'id': i} for i in range(6)]
+    appended = str(tmp_path / 'appended')
+    whole = str(tmp_path / 'whole')
+
+    with RecordWriter(appended, 'ndjson', compression) as writer:
+        for record in records[:3]:
+            writer.write(record)
+    with RecordWriter(appended, 'ndjson', compression, append=True) as writer:
+        for record in records[3:]:
+            writer.write(record)
+    with RecordWriter(whole, 'ndjson', compression) as writer:
+        for record in records:
+            writer.write(record)
+
+    assert decompressed(appended, compression) == decompressed(whole, compression)
+
+def test_anonymized_output_hides_originals(tmp_path, raw_dir):
+    output_path, analysis = run(raw_dir, tmp_path / 'out')
+
+    text = open(output_path, encoding='utf-8').read()
+    records = json.loads(text)
+    assert len(records) == analysis['total_transactions'] == 6
+    for original in ('acc-1', 'tx-acc-1-0', 'Merchant 0', 'INV00000000', 'req-acc-1'):
+        assert original not in text
+    assert 'transactions_sample.json' in os.listdir(tmp_path / 'out')
+
+def test_rerun_without_changes_is_a_noop(tmp_path, raw_dir):
+    output_dir = tmp_path / 'out'
+    output_path, _ = run(raw_dir, output_dir, output_format='ndjson', compression='gzip')
+    before = open(output_path, 'rb').read()
+    manifest = read_manifest(output_dir)
+
+    rerun_path, analysis = run(raw_dir, output_dir, output_format='ndjson', compression='gzip')
+
+    assert rerun_path == output_path
+    assert analysis is None
+    assert open(output_path, 'rb').read() == before
+    assert read_manifest(output_dir)['files'] == manifest['files']
+    assert read_manifest(output_dir)['output'] == manifest['output']
+
+@pytest.mark.parametrize('output_format', ['json', 'ndjson'])
+def test_changed_file_is_reprocessed(tmp_path, raw_dir, output_format):
+    output_dir = tmp_path / 'out'
+    output_path, _ = run(raw_dir, output_dir, output_format=output_format)
+    previous = records_by_trace(output_path)
+
+    changed = next(
+        os.path.join(root, name) for root, _, names in sorted(os.walk(raw_dir)) for name in sorted(names)
+    )
+    with open(changed, encoding='utf-8') as f:
+        record = json.load(f)
+    record['payload']['booked'][0]['transactionAmount']['amount'] = '999.99'
+    with open(changed, 'w', encoding='utf-8') as f:
+        json.dump(record, f)
+
+    _, analysis = run(raw_dir, output_dir, output_format=output_format)
+    current = records_by_trace(output_path)
+    expected_path, _ = run(raw_dir, tmp_path / 'full', output_format=output_format)
+
+    assert analysis['total_transactions'] == 1
+    assert current == records_by_trace(expected_path)
+    assert sum(previous[trace] != current[trace] for trace in current) == 1
+    assert len(read_manifest(output_dir)['files']) == 6
+
+def test_deleted_file_record_is_dropped(tmp_path, raw_dir):
+    output_dir = tmp_path / 'out'
+    output_path, _ = run(raw_dir, output_dir)
+
+    deleted = next(os.path.join(root, name) for root, _, names in sorted(os.walk(raw_dir)) for name in names)
+    os.remove(deleted)
+    run(raw_dir, output_dir)
+    expected_path, _ = run(raw_dir, tmp_path / 'full')
+
+    assert records_by_trace(output_path) == records_by_trace(expected_path)
+    assert read_manifest(output_dir)['output']['records'] == 5
+
+@pytest.mark.parametrize('compression', COMPRESSIONS)
+def test_new_files_are_appended_in_place(tmp_path, raw_dir, add_raw_file, compression):
+    output_dir = tmp_path / 'out'
+    output_path, _ = run(raw_dir, output_dir, output_format='ndjson', compression=compression)
+    before = open(output_path, 'rb').read()
+
+    # A later partition sorts last, so a full run writes the same order
+    add_raw_file(raw_dir, 'acc-4', '2025-07-09T12:00:00.000Z', 6)
+    run(raw_dir, output_dir, output_format='ndjson', compression=compression)
+    expected_path, _ = run(raw_dir, tmp_path / 'full', output_format='ndjson', compression=compression)
+
+    assert open(output_path, 'rb').read().startswith(before)
+    assert decompressed(output_path, compression) == decompressed(expected_path, compression)
+
+def test_output_left_by_an_interrupted_append_is_truncated(tmp_path, raw_dir, add_raw_file):
+    output_dir = tmp_path / 'out'
+    output_path, _ = run(raw_dir, output_dir, output_format='ndjson', compression='gzip')
+    with open(output_path, 'ab') as f:
+        f.write(b'partial member')
+
+    add_raw_file(raw_dir, 'acc-4', '2025-07-09T12:00:00.000Z', 6)
+    run(raw_dir, output_dir, output_format='ndjson', compression='gzip')
+    expected_path, _ = run(raw_dir, tmp_path / 'full', output_format='ndjson', compression='gzip')
+
+    assert decompressed(output_path, 'gzip') == decompressed(expected_path, 'gzip')
+
+def test_changing_the_output_format_forces_a_full_run(tmp_path, raw_dir):
+    output_dir = tmp_path / 'out'
+    run(raw_dir, output_dir, output_format='ndjson')
+
+    output_path, analysis = run(raw_dir, output_dir, output_format='ndjson', compression='gzip')
+
+    assert analysis['total_transactions'] == 6
+    assert read_manifest(output_dir)['output']['path'] == os.path.basename(output_path)
+
+def test_parallel_run_matches_serial(tmp_path, add_raw_file):
+    # Enough records that the anonymizer shards them across the pool
+    raw_dir = str(tmp_path / 'raw_transactions')
+    for index in range(140):
+        add_raw_file(raw_dir, f"acc-{index % 9}", f"2025-07-{index % 28 + 1:02d}T{index % 24:02d}:00:00.000Z", index)
+
+    run(raw_dir, tmp_path / 'serial', workers=1)
+    run(raw_dir, tmp_path / 'parallel', workers=2)
+
+    for name in ('transactions.json', 'analysis.json', 'anonymization_mappings.json', 'anonymizer_state.json'):
+        serial = open(tmp_path / 'serial' / name, 'rb').read()
+        assert open(tmp_path / 'parallel' / name, 'rb').read() == serial, name
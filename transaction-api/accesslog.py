@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Structured Access Log
+
+Sampled JSON-lines access log with a background writer. Request threads
+only decide whether to sample and hand a dict to a bounded queue; encoding
+and writing happen on the writer thread, which drains whatever has queued
+up and writes it in one call. When the writer falls behind, entries are
+dropped and counted rather than blocking requests, so logging costs the
+same per request however busy the server is.
+
+Error responses (5xx) are always logged; everything else is sampled.
+"""
+
+import os
+import sys
+import json
+import queue
+import random
+import threading
+from typing import Any, Dict, Optional
+
+class AccessLog:
+    """Sampled JSON-lines access log written by a background thread"""
+
+    BATCH_SIZE = 512
+
+    def __init__(self, path: str, sample_rate: float, queue_size: int = 10000):
+        self.path = path  # '-' for stdout
+        self.sample_rate = sample_rate
+        self._queue: 'queue.Queue[Dict[str, Any]]' = queue.Queue(queue_size)
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    def sampled(self, status: int) -> bool:
+        """Whether a response with this status goes into the log"""
+        return status >= 500 or random.random() < self.sample_rate
+
+    def write(self, entry: Dict[str, Any]):
+        """Queue an entry without blocking; dropped if the writer is behind"""
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_writer(self):
+        # Started lazily so each forked worker runs its own writer thread
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid != pid:
+                threading.Thread(target=self._run, name='access-log', daemon=True).start()
+                self._pid = pid
+
+    def _run(self):
+        stream = sys.stdout if self.path == '-' else open(self.path, 'a', encoding='utf-8')
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = ''.join(json.dumps(entry, separators=(',', ':'), default=str) + '\n' for entry in batch)
+            try:
+                stream.write(lines)
+                stream.flush()
+                self.written += len(batch)
+            except OSError:
+                self.dropped += len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        """Sampling and delivery counts of this worker"""
+        return {
+            'sample_rate': self.sample_rate,
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped
+        }
@@ -11,13 +11,36 @@ import os
 import json
 import time
 import logging
-from datetime import datetime
-from typing import Dict, List, Any, Optional
-from flask import Flask, jsonify, request, Response
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Tuple
+from flask import Flask, jsonify, request, Response, g
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from functools import wraps
+from contextlib import contextmanager
 import threading
 import random
+import resource
+import base64
+import binascii
+import math
+import hashlib
+import hmac
+from bisect import bisect_left, bisect_right
+from decimal import Decimal, DecimalException, InvalidOperation
+
+from dataset import (
+    AccountPageStore, DatasetCollection, encode_json, load_dataset, data_signature, file_signature,
+    date_to_int, int_to_date, amount_bound, DEFAULT_CHUNK_SIZE
+)
+from ratelimit import TokenBucketLimiter
+from faults import FaultProfile, load_profile
+from compression import PageCompressor, available_encodings, compress, iter_compressed
+from formats import (
+    MEDIA_TYPES, FORMAT_MIMETYPES, available_media_types, parse_fields, project, to_columns, encode_msgpack
+)
+import metrics
+from accesslog import AccessLog
 
 # Configure logging
 logging.basicConfig(
@@ -27,12 +50,32 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for candidate applications
+CORS(app, expose_headers=[  # Enable CORS for candidate applications
+    'Retry-After', 'X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Reset',
+    'X-Total-Count', 'X-High-Water-Mark', 'ETag'
+])
+
+class DataGeneration:
+    """
+    One loaded dataset plus its load metadata. Reloads build a new
+    generation and publish it by rebinding a single global, so requests see
+    either the old data or the new data, never a mix.
+    """
+    
+    def __init__(self, number: int, dataset: Any, signature: Any, load_stats: Dict[str, Any]):
+        self.number = number
+        self.dataset = dataset  # Dataset or DatasetCollection
+        self.signature = signature  # data_signature() of the source when loading started
+        self.load_stats = load_stats
+        self.accounts: Dict[str, AccountPageStore] = dataset.accounts  # Hash index for existence checks
+        self.account_ids: List[str] = dataset.account_ids  # Sorted, for listing and keyset pagination
+        self.summaries: Dict[str, Dict[str, Any]] = dataset.summaries
+        self.summary: Dict[str, Any] = dataset.summary
+        self.digest: str = dataset.digest  # Content-derived, so every worker agrees on it
 
 # Global variables for data and configuration
-transaction_data: List[Dict[str, Any]] = []
-accounts_cache: List[str] = []
-transactions_by_account: Dict[str, List[Dict[str, Any]]] = {}
+data_generation = DataGeneration(0, DatasetCollection({}, []), None, {})
+reload_lock = threading.Lock()
 
 # Configuration
 CONFIG = {
@@ -41,9 +84,102 @@ CONFIG = {
     'max_delay': float(os.getenv('MAX_DELAY', '0.5')),    # Maximum random delay
     'default_page_size': int(os.getenv('DEFAULT_PAGE_SIZE', '10')),
     'max_page_size': int(os.getenv('MAX_PAGE_SIZE', '100')),
-    'rate_limit_delay': float(os.getenv('RATE_LIMIT_DELAY', '0.05'))  # Additional delay for rate limiting
+    'rate_limit_capacity': int(os.getenv('RATE_LIMIT_CAPACITY', '20')),  # Burst size per client (0 disables limiting)
+    'rate_limit_refill_rate': float(os.getenv('RATE_LIMIT_REFILL_RATE', '10')),  # Tokens added per second per client
+    'rate_limit_key_header': os.getenv('RATE_LIMIT_KEY_HEADER', 'X-Client-Id'),  # Identifies clients; falls back to IP
+    'rate_limit_state_path': os.getenv('RATE_LIMIT_STATE_PATH', '/tmp/transaction-api-ratelimit.bin'),  # Shared by workers
+    'fault_profiles_path': os.getenv('FAULT_PROFILES_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fault_profiles.json')),
+    'fault_profile': os.getenv('FAULT_PROFILE', ''),  # Named latency/fault profile; empty keeps the plain uniform delay
+    'load_chunk_size': int(os.getenv('LOAD_CHUNK_SIZE', str(DEFAULT_CHUNK_SIZE))),  # Bytes read per step while streaming data
+    'export_batch_size': int(os.getenv('EXPORT_BATCH_SIZE', '256')),  # Records per chunk in /transactions/export
+    'reload_interval': float(os.getenv('RELOAD_INTERVAL', '0')),  # Seconds between data path checks (0 disables watching)
+    'reload_trigger_path': os.getenv('RELOAD_TRIGGER_PATH', '/tmp/transaction-api-reload'),  # Touched by /admin/reload for other workers
+    'admin_token': os.getenv('ADMIN_TOKEN', ''),  # Expected in X-Admin-Token by /admin/reload (unset disables the endpoint)
+    'cache_max_age': int(os.getenv('CACHE_MAX_AGE', '0')),  # Seconds clients may reuse a response unrevalidated
+    'compression_min_size': int(os.getenv('COMPRESSION_MIN_SIZE', '1024')),  # Smaller bodies are sent uncompressed
+    'compression_cache_mb': float(os.getenv('COMPRESSION_CACHE_MB', '64')),  # Compressed page segments kept per worker
+    'metrics_dir': os.getenv('METRICS_DIR', metrics.DEFAULT_DIRECTORY),  # Per-worker metric files merged by /metrics
+    'access_log_path': os.getenv('ACCESS_LOG_PATH', '-'),  # JSON-lines access log file, '-' for stdout
+    'access_log_sample_rate': float(os.getenv('ACCESS_LOG_SAMPLE_RATE', '1.0')),  # Share of non-5xx requests logged (0 disables)
+    'access_log_queue_size': int(os.getenv('ACCESS_LOG_QUEUE_SIZE', '10000'))  # Entries buffered before new ones are dropped
 }
 
+# Per-client token buckets shared by all workers through a mmap'd state file
+rate_limiter: Optional[TokenBucketLimiter] = None
+if CONFIG['rate_limit_capacity'] < 0:
+    raise ValueError("RATE_LIMIT_CAPACITY must be 0 (no limiting) or a positive burst size")
+if CONFIG['rate_limit_capacity'] > 0:
+    rate_limiter = TokenBucketLimiter(
+        CONFIG['rate_limit_state_path'],
+        CONFIG['rate_limit_capacity'],
+        CONFIG['rate_limit_refill_rate']
+    )
+
+# Compressed record segments of hot pages, so each is compressed once per encoding
+page_compressor = PageCompressor(int(CONFIG['compression_cache_mb'] * 1024 * 1024))
+
+# Optional latency/fault injection profile for load testing consumers
+fault_profile: Optional[FaultProfile] = None
+if CONFIG['fault_profile']:
+    fault_profile = load_profile(CONFIG['fault_profiles_path'], CONFIG['fault_profile'])
+
+# Request metrics; each worker writes its own file and /metrics merges them all.
+# The development server is its own master; under gunicorn the master clears
+# the directory in its on_starting hook
+if __name__ == '__main__':
+    metrics.clear_directory(CONFIG['metrics_dir'])
+metrics_registry = metrics.MetricsRegistry(CONFIG['metrics_dir'])
+REQUESTS = metrics_registry.counter(
+    'transaction_api_requests_total', 'Requests handled', ['route', 'method', 'status']
+)
+REQUEST_DURATION = metrics_registry.histogram(
+    'transaction_api_request_duration_seconds', 'Time from request start to response, injected delay included',
+    ['route', 'method', 'status']
+)
+HANDLER_DURATION = metrics_registry.histogram(
+    'transaction_api_handler_duration_seconds', 'Time spent handling the request, injected delay excluded',
+    ['route', 'method', 'status']
+)
+INJECTED_DELAY = metrics_registry.histogram(
+    'transaction_api_injected_delay_seconds', 'Simulated latency added to the request', ['route']
+)
+SERIALIZATION_DURATION = metrics_registry.histogram(
+    'transaction_api_serialization_duration_seconds', 'Time spent encoding and compressing response bodies',
+    ['route'], buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+RESPONSE_BYTES = metrics_registry.histogram(
+    'transaction_api_response_bytes', 'Response body size as sent (streamed bodies are not counted)',
+    ['route', 'status'], buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+IN_FLIGHT = metrics_registry.gauge(
+    'transaction_api_requests_in_flight', 'Requests currently being handled'
+)
+DATASET_LOAD_DURATION = metrics_registry.histogram(
+    'transaction_api_dataset_load_duration_seconds', 'Time taken to load or reload the dataset', ['result'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+# Sampled structured access log, written off the request path
+access_log = AccessLog(CONFIG['access_log_path'], CONFIG['access_log_sample_rate'], CONFIG['access_log_queue_size'])
+
+@contextmanager
+def serialization_timer():
+    """Count the enclosed work towards the request's serialization time"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.serialization_seconds = g.get('serialization_seconds', 0.0) + time.perf_counter() - started
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, with jsonify() timed as serialization"""
+    
+    def response(self, *args, **kwargs) -> Response:
+        with serialization_timer():
+            return super().response(*args, **kwargs)
+
+app.json = TimedJSONProvider(app)
+
 class APIError(Exception):
     """Custom API error with status codes"""
     def __init__(self, message: str, status_code: int = 400):
@@ -51,16 +187,230 @@ class APIError(Exception):
         self.status_code = status_code
         super().__init__(self.message)
 
+def negotiate_encoding() -> Optional[str]:
+    """Best content coding the client accepts, or None for identity"""
+    return request.accept_encodings.best_match(available_encodings())
+
+def negotiate_format() -> str:
+    """Response format for the client's Accept header, JSON unless it asks for another"""
+    media_type = request.accept_mimetypes.best_match(available_media_types())
+    return MEDIA_TYPES.get(media_type, 'json')
+
+def parse_fields_param() -> Optional[list]:
+    """Validated fields projection, or None to return whole records"""
+    if 'fields' not in request.args:
+        return None
+    try:
+        return parse_fields(request.args['fields'])
+    except ValueError as e:
+        raise APIError(f"Invalid fields parameter: {e}", 400)
+
+def parse_filters() -> Optional[Dict[str, Any]]:
+    """Transaction filters from the query string, as TransactionIndex.match arguments, or None if there are none"""
+    filters = {}
+    
+    for param, key in (('booking_date_from', 'date_from'), ('booking_date_to', 'date_to')):
+        if param in request.args:
+            filters[key] = date_to_int(request.args[param])
+            if not filters[key]:
+                raise APIError(f"Invalid {param}, expected YYYY-MM-DD", 400)
+    
+    if 'status' in request.args:
+        filters['status'] = request.args['status']
+        if filters['status'] not in ('booked', 'pending'):
+            raise APIError("Invalid status, expected booked or pending", 400)
+    
+    for param in ('amount_min', 'amount_max'):
+        if param in request.args:
+            try:
+                value = Decimal(request.args[param])
+                if not value.is_finite():
+                    raise InvalidOperation(value)
+                # Overflows for exponents beyond the decimal context's range
+                filters[param] = amount_bound(value, upper=param == 'amount_max')
+            except DecimalException:
+                raise APIError(f"Invalid {param}, expected a decimal number", 400)
+    
+    if 'transaction_code' in request.args:
+        filters['codes'] = request.args['transaction_code'].split(',')
+        if not all(filters['codes']):
+            raise APIError("Invalid transaction_code, expected comma-separated codes", 400)
+    
+    return filters or None
+
+def json_response_with_array(obj: Dict[str, Any], key: str, items, cache_key: Optional[Tuple] = None) -> Response:
+    """
+    Build a JSON response from obj plus a pre-encoded array spliced in under
+    key. The key is appended last, so it must sort after obj's own keys to
+    keep the output identical to jsonify.
+    
+    With a cache_key identifying the items (it must change whenever they
+    do), a compressed response reuses the cached compressed items.
+    """
+    with serialization_timer():
+        head = b''.join([encode_json(obj)[:-1], b',' if obj else b'', encode_json(key), b':['])
+        tail = b']}\n'
+        
+        encoding = negotiate_encoding() if cache_key is not None else None
+        if encoding and len(head) + len(items) + len(tail) >= CONFIG['compression_min_size']:
+            response = Response(
+                page_compressor.compress_page(cache_key, head, items, tail, encoding),
+                mimetype='application/json'
+            )
+            response.headers['Content-Encoding'] = encoding
+            return response
+        
+        return Response(b''.join([head, items, tail]), mimetype='application/json')
+
+def encode_cursor(store: AccountPageStore, index: int) -> Optional[str]:
+    """Opaque continuation token for resuming at record index, or None at the end"""
+    if index >= len(store) or index <= 0:
+        return None
+    created_at, seen = store.keyset_position(index)
+    raw = f"{created_at}|{seen}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(store: AccountPageStore, token: str) -> int:
+    """Resolve a continuation token to the record index it resumes at"""
+    if not token:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8')
+        created_at, seen = raw.rsplit('|', 1)
+        seen = int(seen)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise APIError("Invalid cursor", 400)
+    if seen < 0:
+        raise APIError("Invalid cursor", 400)
+    return store.index_from_keyset(created_at, seen)
+
+def parse_pagination() -> Tuple[int, int]:
+    """Validate the page and per_page query parameters"""
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', CONFIG['default_page_size']))
+    except ValueError:
+        raise APIError("Invalid pagination parameters", 400)
+    
+    if page < 1:
+        raise APIError("Page number must be >= 1", 400)
+    
+    if per_page < 1 or per_page > CONFIG['max_page_size']:
+        raise APIError(f"Page size must be between 1 and {CONFIG['max_page_size']}", 400)
+    
+    return page, per_page
+
+def parse_since() -> Optional[str]:
+    """
+    The optional since query parameter (an ISO 8601 createdAt bound),
+    converted to UTC and formatted like the stored createdAt values so it
+    can be bisected against them. Times without an offset are taken as UTC.
+    """
+    since = request.args.get('since')
+    if since is None:
+        return None
+    try:
+        moment = datetime.fromisoformat(since)
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    except (ValueError, OverflowError):
+        raise APIError("Invalid since timestamp, expected ISO 8601", 400)
+    # Stored values have millisecond precision, so truncating keeps "strictly after" exact
+    return moment.isoformat(timespec='milliseconds') + 'Z'
+
+def summary_fields(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Response fields shared by the account summary and stats endpoints"""
+    return {
+        'total_transaction_records': summary['records'],
+        'total_pending_transactions': summary['pending'],
+        'total_booked_transactions': summary['booked'],
+        'date_range': {
+            'first_transaction': summary['first_created'],
+            'last_transaction': summary['last_created'],
+            'first_booking_date': summary['first_booking_date'],
+            'last_booking_date': summary['last_booking_date']
+        },
+        'amount_totals': summary['amounts']
+    }
+
+def current_data() -> DataGeneration:
+    """
+    The data generation serving this request. It is pinned on first use so
+    a reload that lands mid-request can't switch data under the handler.
+    """
+    if 'data' not in g:
+        g.data = data_generation
+    return g.data
+
+def not_modified(*digests: str) -> Optional[Response]:
+    """
+    Tag the response with an ETag derived from the content digests it is
+    built from plus the request path and query, and return a 304 when the
+    client's If-None-Match already has it, before any body is serialized.
+    Tags are weak since bodies carry a generation timestamp.
+    """
+    etag = hashlib.blake2b(digest_size=12)
+    etag.update(request.path.encode('utf-8'))
+    for name, value in sorted(request.args.items(multi=True)):
+        etag.update(f"\0{name}={value}".encode('utf-8'))
+    for digest in digests:
+        etag.update(f"\0{digest}".encode('utf-8'))
+    g.etag = etag.hexdigest()
+    
+    if request.if_none_match.contains_weak(g.etag):
+        return Response(status=304)
+    return None
+
+# WSGI environ key under which asgi.py collects delays to await asynchronously
+DEFERRED_DELAY_KEY = 'transaction_api.deferred_delays'
+# WSGI environ key through which the metrics route label is handed back to asgi.py
+METRICS_ROUTE_KEY = 'transaction_api.metrics_route'
+
+def inject_delay(seconds: float):
+    """
+    Sleep for simulated latency. Under the ASGI server the delay is
+    recorded instead and awaited with asyncio.sleep after the handler
+    returns, so slow requests don't hold a thread.
+    """
+    g.injected_delay = g.get('injected_delay', 0.0) + seconds
+    deferred = request.environ.get(DEFERRED_DELAY_KEY)
+    if deferred is not None:
+        deferred.append(seconds)
+    else:
+        time.sleep(seconds)
+
 def simulate_network_delay():
-    """Add realistic network latency simulation"""
-    base_delay = CONFIG['base_delay']
-    random_variance = random.uniform(0, CONFIG['max_delay'] - base_delay)
-    total_delay = base_delay + random_variance
-    time.sleep(total_delay)
+    """Add realistic network latency simulation, plus faults from the active profile"""
+    if fault_profile is None:
+        base_delay = CONFIG['base_delay']
+        random_variance = random.uniform(0, CONFIG['max_delay'] - base_delay)
+        total_delay = base_delay + random_variance
+        inject_delay(total_delay)
+        return
+    
+    rng = fault_profile.request_rng(request.headers.get('X-Fault-Key'))
+    g.fault_rng = rng
+    route = request.url_rule.rule if request.url_rule else request.path
+    
+    inject_delay(fault_profile.latency(rng) + fault_profile.stall(rng))
+    
+    status = fault_profile.error_status(rng, route)
+    if status is not None:
+        raise APIError(f"Injected fault ({fault_profile.name})", status)
 
 def rate_limit():
-    """Simple rate limiting simulation"""
-    time.sleep(CONFIG['rate_limit_delay'])
+    """Spend one token from the client's bucket, rejecting with 429 when it is empty"""
+    if rate_limiter is None:
+        return
+    
+    client_id = request.headers.get(CONFIG['rate_limit_key_header'])
+    key = f"client:{client_id}" if client_id else f"ip:{request.remote_addr}"
+    
+    decision = rate_limiter.acquire(key)
+    g.rate_limit = decision
+    
+    if not decision.allowed:
+        raise APIError(f"Rate limit exceeded, retry in {math.ceil(decision.retry_after)} seconds", 429)
 
 def error_handler(f):
     """Decorator for consistent error handling"""
@@ -69,59 +419,224 @@ def error_handler(f):
         try:
             return f(*args, **kwargs)
         except APIError as e:
-            logger.warning(f"API Error: {e.message}")
+            # Client errors (429s included) are routine, so they reach the log
+            # through the sampled access log; only server errors are warned about
+            log_request(error=e.message)
+            if e.status_code >= 500:
+                logger.warning(f"API Error: {e.message}")
+            else:
+                logger.debug(f"API Error: {e.message}")
             return jsonify({'error': e.message}), e.status_code
         except Exception as e:
             logger.error(f"Unexpected error: {str(e)}")
             return jsonify({'error': 'Internal server error'}), 500
     return decorated_function
 
-def load_transaction_data():
-    """Load and organize transaction data on startup"""
-    global transaction_data, accounts_cache, transactions_by_account
+def metrics_route() -> str:
+    """Route template to label metrics with; unmatched paths share one label to bound cardinality"""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+def deferred_delays() -> bool:
+    """Whether this request runs under asgi.py, which awaits its delays after the handler"""
+    return DEFERRED_DELAY_KEY in request.environ
+
+@app.before_request
+def start_request_metrics():
+    """Note the start of the request and count it as in flight"""
+    g.request_started = time.perf_counter()
+    # asgi.py counts its requests itself, until the deferred delay has been
+    # awaited and the response sent; these hooks finish before that
+    if not deferred_delays():
+        IN_FLIGHT.inc()
+
+def request_timings() -> Tuple[float, float]:
+    """Seconds spent in the handler and in injected delay so far"""
+    elapsed = time.perf_counter() - g.request_started
+    injected = g.get('injected_delay', 0.0)
+    # Under asgi.py the injected delay is awaited after the handler returns,
+    # so the handler's own time is already all of elapsed
+    if deferred_delays():
+        return elapsed, injected
+    return max(elapsed - injected, 0.0), injected
+
+def response_size(response: Response) -> Optional[int]:
+    """Body length, or None for streamed bodies (measuring those would buffer them)"""
+    return None if response.is_streamed else response.calculate_content_length()
+
+def log_request(**fields: Any):
+    """Add handler-specific fields to the request's access log entry"""
+    g.access_log_fields = {**g.get('access_log_fields', {}), **fields}
+
+# These two are registered before the other after_request hooks so they run
+# after them and see the final (e.g. compressed) body
+@app.after_request
+def record_request_metrics(response: Response) -> Response:
+    """Record the request's timings and response size"""
+    handler_seconds, injected = request_timings()
+    route = metrics_route()
+    status = str(response.status_code)
+    
+    REQUESTS.inc(route=route, method=request.method, status=status)
+    if deferred_delays():
+        # asgi.py observes the whole request once the response is sent
+        request.environ[METRICS_ROUTE_KEY] = route
+    else:
+        REQUEST_DURATION.observe(handler_seconds + injected, route=route, method=request.method, status=status)
+    HANDLER_DURATION.observe(handler_seconds, route=route, method=request.method, status=status)
+    if 'injected_delay' in g:
+        INJECTED_DELAY.observe(injected, route=route)
+    if 'serialization_seconds' in g:
+        SERIALIZATION_DURATION.observe(g.serialization_seconds, route=route)
+    
+    size = response_size(response)
+    if size is not None:
+        RESPONSE_BYTES.observe(size, route=route, status=status)
+    return response
+
+@app.after_request
+def write_access_log(response: Response) -> Response:
+    """Queue a structured access log entry for sampled requests"""
+    if not access_log.sampled(response.status_code):
+        return response
+    
+    handler_seconds, injected = request_timings()
+    client_id = request.headers.get(CONFIG['rate_limit_key_header'])
+    access_log.write({
+        'timestamp': datetime.utcnow().isoformat(),
+        'method': request.method,
+        'path': request.path,
+        'query': request.query_string.decode('latin-1'),
+        'route': metrics_route(),
+        'status': response.status_code,
+        'duration_ms': round((handler_seconds + injected) * 1000, 3),
+        'handler_ms': round(handler_seconds * 1000, 3),
+        'delay_ms': round(injected * 1000, 3),
+        'bytes': response_size(response),
+        'client': f"client:{client_id}" if client_id else f"ip:{request.remote_addr}",
+        **g.get('access_log_fields', {})
+    })
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error: Optional[BaseException]):
+    """Take the request out of the in-flight count, however it ended"""
+    if 'request_started' in g and not deferred_delays():
+        IN_FLIGHT.dec()
+
+@app.after_request
+def add_rate_limit_headers(response: Response) -> Response:
+    """Report the client's remaining budget so it can tune its concurrency"""
+    decision = g.get('rate_limit')
+    if decision is not None:
+        response.headers['X-RateLimit-Limit'] = str(decision.limit)
+        response.headers['X-RateLimit-Remaining'] = str(decision.remaining)
+        response.headers['X-RateLimit-Reset'] = str(math.ceil(decision.reset_after))
+        if not decision.allowed:
+            response.headers['Retry-After'] = str(max(1, math.ceil(decision.retry_after)))
+    return response
+
+@app.after_request
+def add_cache_headers(response: Response) -> Response:
+    """Send the ETag and caching policy for responses built from loaded data"""
+    etag = g.get('etag')
+    if etag is not None and response.status_code in (200, 304):
+        response.set_etag(etag, weak=True)
+        max_age = CONFIG['cache_max_age']
+        response.headers['Cache-Control'] = f"public, max-age={max_age}, must-revalidate" if max_age else 'no-cache'
+    return response
+
+@app.after_request
+def truncate_response(response: Response) -> Response:
+    """Cut the body short when the active fault profile calls for a truncated page"""
+    rng = g.get('fault_rng')
+    if rng is None or response.status_code != 200 or response.is_streamed:
+        return response
+    
+    route = request.url_rule.rule if request.url_rule else request.path
+    body = response.get_data()
+    cut = fault_profile.truncate_at(rng, route, len(body))
+    if cut is not None:
+        logger.warning(f"Injected truncation ({fault_profile.name}): {len(body)} -> {cut} bytes")
+        response.set_data(body[:cut])
+        # Runs before add_cache_headers: no ETag or caching for the cut body,
+        # or a revalidation would pin it in the client's cache with a 304
+        g.pop('etag', None)
+    return response
+
+COMPRESSIBLE_MIMETYPES = {'application/x-ndjson', *FORMAT_MIMETYPES.values()}
+
+@app.after_request
+def compress_response(response: Response) -> Response:
+    """gzip/zstd-encode JSON bodies the client accepts, unless the handler already did"""
+    if response.status_code == 304:
+        response.vary.add('Accept-Encoding')
+        return response
+    if response.status_code != 200 or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    if 'Content-Encoding' in response.headers:
+        return response
+    
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+    
+    if response.is_streamed:
+        response.response = iter_compressed(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < CONFIG['compression_min_size']:
+            return response
+        with serialization_timer():
+            response.set_data(compress(body, encoding))
     
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)"""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def load_transaction_data(previous: Optional[DataGeneration] = None) -> DataGeneration:
+    """
+    Load transaction data from a snapshot, JSON export or data directory and
+    index it by account. Given the previous generation, files of a data
+    directory that haven't changed are reused instead of reparsed.
+    """
+    started = time.perf_counter()
+    result = 'failure'
     try:
         logger.info(f"Loading transaction data from {CONFIG['data_path']}")
         
-        with open(CONFIG['data_path'], 'r', encoding='utf-8') as f:
-            transaction_data = json.load(f)
-        
-        logger.info(f"Loaded {len(transaction_data)} transaction records")
+        # Taken before reading, so a write that races the load is picked up
+        # by the next check
+        signature = data_signature(CONFIG['data_path'])
         
-        # Extract unique account IDs
-        account_ids = set()
-        transactions_by_account = {}
-        
-        for tx_record in transaction_data:
-            account_id = tx_record['metadata']['accountId']
-            account_ids.add(account_id)
-            
-            if account_id not in transactions_by_account:
-                transactions_by_account[account_id] = []
-            transactions_by_account[account_id].append(tx_record)
-        
-        # Sort accounts for deterministic results
-        accounts_cache = sorted(list(account_ids))
-        
-        # Sort transactions by timestamp for each account
-        for account_id in transactions_by_account:
-            transactions_by_account[account_id].sort(
-                key=lambda x: x['metadata']['createdAt']
-            )
+        # Snapshots are memory-mapped; JSON/NDJSON exports are streamed
+        # into pre-encoded per-account buffers
+        dataset = load_dataset(
+            CONFIG['data_path'], CONFIG['load_chunk_size'], previous.dataset if previous else None
+        )
         
-        logger.info(f"Organized transactions for {len(accounts_cache)} accounts")
+        logger.info(f"Loaded {dataset.total_records} transaction records")
+        logger.info(f"Organized transactions for {len(dataset.account_ids)} accounts")
+        logger.info(f"Dataset contains {dataset.total_pending} pending and {dataset.total_booked} booked transactions")
         
-        # Log some statistics
-        total_pending = sum(
-            len(tx['payload'].get('pending', []))
-            for tx in transaction_data
-        )
-        total_booked = sum(
-            len(tx['payload'].get('booked', []))
-            for tx in transaction_data
-        )
+        load_stats = {
+            'source': CONFIG['data_path'],
+            'format': dataset.source_format,
+            'records': dataset.total_records,
+            'files_reparsed': len(dataset.reparsed) if isinstance(dataset, DatasetCollection) else 1,
+            'loaded_at': datetime.utcnow().isoformat(),
+            'load_seconds': round(time.perf_counter() - started, 3),
+            'peak_rss_mb': peak_rss_mb()
+        }
+        logger.info(f"Load took {load_stats['load_seconds']}s, peak RSS {load_stats['peak_rss_mb']} MB")
         
-        logger.info(f"Dataset contains {total_pending} pending and {total_booked} booked transactions")
+        result = 'success'
+        return DataGeneration(previous.number + 1 if previous else 1, dataset, signature, load_stats)
         
     except FileNotFoundError:
         logger.error(f"Transaction data file not found: {CONFIG['data_path']}")
@@ -132,20 +647,91 @@ def load_transaction_data():
     except Exception as e:
         logger.error(f"Error loading transaction data: {e}")
         raise
+    finally:
+        DATASET_LOAD_DURATION.observe(time.perf_counter() - started, result=result)
+
+def reload_transaction_data(force: bool = False) -> bool:
+    """
+    Build the next generation in the calling thread and swap it in.
+    Requests already running keep the generation they started with; the old
+    one is freed once they finish. Returns whether a new generation was
+    published (False if unchanged, already reloading, or the load failed).
+    """
+    global data_generation
+    
+    if not reload_lock.acquire(blocking=False):
+        return False
+    try:
+        previous = data_generation
+        if not force and data_signature(CONFIG['data_path']) == previous.signature:
+            return False
+        
+        data_generation = load_transaction_data(previous)
+        logger.info(f"Swapped in data generation {data_generation.number} (was {previous.number})")
+        return True
+    except Exception as e:
+        logger.error(f"Reload failed, still serving data generation {data_generation.number}: {e}")
+        return False
+    finally:
+        reload_lock.release()
+
+def reload_trigger_signature() -> Optional[Tuple[int, int]]:
+    """Signature of the shared reload trigger file, or None if it doesn't exist"""
+    try:
+        return file_signature(CONFIG['reload_trigger_path'])
+    except FileNotFoundError:
+        return None
+
+# Last reload trigger this worker has acted on
+seen_reload_trigger = reload_trigger_signature()
+
+def watch_data_path():
+    """Poll the data path and the reload trigger file, reloading when either changes"""
+    global seen_reload_trigger
+    
+    while True:
+        time.sleep(CONFIG['reload_interval'])
+        try:
+            trigger = reload_trigger_signature()
+            if trigger != seen_reload_trigger:
+                seen_reload_trigger = trigger
+                reload_transaction_data(force=True)
+            else:
+                reload_transaction_data()
+        except Exception as e:
+            logger.error(f"Error checking for data changes: {e}")
 
 @app.route('/health', methods=['GET'])
 @error_handler
 def health_check():
     """Health check endpoint"""
+    data = current_data()
+    
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.utcnow().isoformat(),
         'version': '1.0.0',
-        'data_loaded': len(transaction_data) > 0,
-        'accounts_available': len(accounts_cache),
-        'total_transaction_records': len(transaction_data)
+        'data_loaded': data.load_stats.get('records', 0) > 0,
+        'accounts_available': len(data.account_ids),
+        'total_transaction_records': data.load_stats.get('records', 0),
+        'data_load': {
+            'generation': data.number,
+            'format': data.load_stats.get('format'),
+            'loaded_at': data.load_stats.get('loaded_at'),
+            'files_reparsed': data.load_stats.get('files_reparsed'),
+            'load_seconds': data.load_stats.get('load_seconds'),
+            'peak_rss_mb': data.load_stats.get('peak_rss_mb')
+        },
+        'compression_cache': page_compressor.stats(),
+        'access_log': access_log.stats()
     })
 
+@app.route('/metrics', methods=['GET'])
+@error_handler
+def get_metrics():
+    """Prometheus metrics, merged across all workers"""
+    return Response(metrics_registry.exposition(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/accounts', methods=['GET'])
 @error_handler
 def get_accounts():
@@ -153,14 +739,70 @@ def get_accounts():
     simulate_network_delay()
     rate_limit()
     
-    if not accounts_cache:
+    data = current_data()
+    
+    if not data.account_ids:
         raise APIError("No accounts available", 503)
     
-    logger.info(f"Returning {len(accounts_cache)} account IDs")
+    account_ids = data.account_ids
+    total_count = len(account_ids)
+    
+    if not any(param in request.args for param in ('page', 'per_page', 'after')):
+        # Unpaginated listing, kept for existing clients
+        cached = not_modified(data.digest)
+        if cached:
+            return cached
+        
+        log_request(accounts=total_count)
+        
+        return jsonify({
+            'accounts': account_ids,
+            'total_count': total_count,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    
+    page, per_page = parse_pagination()
+    
+    if 'after' in request.args:
+        # Keyset pagination: resume after the last account ID the client saw,
+        # which stays correct when a reload adds or removes accounts
+        if 'page' in request.args:
+            raise APIError("Use either page or after, not both", 400)
+        start = bisect_right(account_ids, request.args['after']) if request.args['after'] else 0
+        page_ids = account_ids[start:start + per_page]
+        has_next = start + per_page < total_count
+        pagination = {
+            'per_page': per_page,
+            'total_count': total_count,
+            'has_next': has_next,
+            'next_cursor': page_ids[-1] if has_next else None
+        }
+    else:
+        start = (page - 1) * per_page
+        if start >= total_count:
+            raise APIError(f"Page {page} is beyond available data", 404)
+        page_ids = account_ids[start:start + per_page]
+        has_next = start + per_page < total_count
+        pagination = {
+            'page': page,
+            'per_page': per_page,
+            'total_count': total_count,
+            'total_pages': (total_count + per_page - 1) // per_page,
+            'has_next': has_next,
+            'has_prev': page > 1,
+            'next_cursor': page_ids[-1] if has_next else None
+        }
+    
+    cached = not_modified(data.digest)
+    if cached:
+        return cached
+    
+    log_request(accounts=len(page_ids))
     
     return jsonify({
-        'accounts': accounts_cache,
-        'total_count': len(accounts_cache),
+        'accounts': page_ids,
+        'pagination': pagination,
+        'total_count': total_count,
         'timestamp': datetime.utcnow().isoformat()
     })
 
@@ -171,100 +813,306 @@ def get_account_transactions(account_id: str):
     simulate_network_delay()
     rate_limit()
     
+    data = current_data()
+    
     # Validate account exists
-    if account_id not in accounts_cache:
+    if account_id not in data.accounts:
         raise APIError(f"Account not found: {account_id}", 404)
     
     # Get pagination parameters
-    try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', CONFIG['default_page_size']))
-    except ValueError:
-        raise APIError("Invalid pagination parameters", 400)
+    page, per_page = parse_pagination()
+    fields = parse_fields_param()
+    response_format = negotiate_format()
     
-    if page < 1:
-        raise APIError("Page number must be >= 1", 400)
+    # Get transactions for this account
+    account_transactions = data.accounts[account_id]
+    record_count = len(account_transactions)
     
-    if per_page < 1 or per_page > CONFIG['max_page_size']:
-        raise APIError(f"Page size must be between 1 and {CONFIG['max_page_size']}", 400)
+    # Incremental sync: only records created after the since timestamp
+    since = parse_since()
+    first_index = account_transactions.index_after(since) if since is not None else 0
     
-    # Get transactions for this account
-    account_transactions = transactions_by_account.get(account_id, [])
+    # Record indexes to page through: a contiguous run unless filtered
+    filters = parse_filters()
+    if filters is None:
+        matches = None
+        positions = range(first_index, record_count)
+    else:
+        matches = account_transactions.transactions.match(**filters)
+        positions = sorted(index for index in matches if index >= first_index)
+    total_count = len(positions)
+    
+    if 'after' in request.args:
+        # Cursor pagination: resume just after the last record the client saw
+        if 'page' in request.args:
+            raise APIError("Use either page or after, not both", 400)
+        
+        start = bisect_left(positions, decode_cursor(account_transactions, request.args['after']))
+        page_positions = positions[start:start + per_page]
+        has_next = start + per_page < total_count
+        
+        pagination = {
+            'per_page': per_page,
+            'total_count': total_count,
+            'has_next': has_next,
+            'next_cursor': encode_cursor(account_transactions, page_positions[-1] + 1) if has_next else None
+        }
+        log_position = f"cursor at {page_positions[0] if page_positions else record_count}"
+    else:
+        # Calculate pagination
+        start = (page - 1) * per_page
+        page_positions = positions[start:start + per_page]
+        has_next = start + per_page < total_count
+        
+        if start >= total_count and total_count > 0:
+            raise APIError(f"Page {page} is beyond available data", 404)
+        
+        pagination = {
+            'page': page,
+            'per_page': per_page,
+            'total_count': total_count,
+            'total_pages': (total_count + per_page - 1) // per_page,
+            'has_next': has_next,
+            'has_prev': page > 1,
+            'next_cursor': encode_cursor(account_transactions, page_positions[-1] + 1) if has_next else None
+        }
+        log_position = f"page {page}"
+    
+    cached = not_modified(account_transactions.digest, response_format)
+    if cached:
+        cached.vary.add('Accept')
+        return cached
+    
+    log_request(account=account_id, position=log_position, records=len(page_positions))
+    
+    response_data = {
+        'pagination': pagination,
+        'account_id': account_id,
+        'timestamp': datetime.utcnow().isoformat()
+    }
+    
+    if since is not None:
+        # Newest createdAt the account has; pass it as since on the next
+        # sync once every page of this one has been fetched
+        response_data['since'] = since
+        response_data['high_water_mark'] = (
+            account_transactions.created_at[-1] if record_count > first_index else since
+        )
+    
+    if matches is None and response_format == 'json' and fields is None:
+        # Unfiltered pages are a contiguous run of pre-encoded records
+        start_index = page_positions[0] if page_positions else record_count
+        end_index = start_index + len(page_positions)
+        response = json_response_with_array(
+            response_data, 'transactions', account_transactions.page_bytes(start_index, end_index),
+            cache_key=(account_id, account_transactions.digest, 'records', start_index, end_index)
+        )
+    else:
+        # Filters, projections and other formats need the records as objects
+        records = []
+        for index in page_positions:
+            record = json.loads(bytes(account_transactions.page_bytes(index, index + 1)))
+            if matches is not None:
+                # Keep only the transactions that passed the filters
+                payload = record['payload']
+                for status in ('booked', 'pending'):
+                    if status in payload:
+                        payload[status] = [payload[status][i] for i in matches[index].get(status, [])]
+            records.append(record)
+        
+        if response_format == 'columnar':
+            response_data['fields'] = ['.'.join(path) for path in fields] if fields else None
+            response_data['columns'] = to_columns(records, fields)
+        else:
+            response_data['transactions'] = project(records, fields) if fields else records
+        
+        with serialization_timer():
+            if response_format == 'msgpack':
+                response = Response(encode_msgpack(response_data), mimetype=FORMAT_MIMETYPES['msgpack'])
+            else:
+                response = Response(encode_json(response_data) + b'\n', mimetype=FORMAT_MIMETYPES[response_format])
+    
+    response.vary.add('Accept')
+    return response
+
+@app.route('/accounts/<account_id>/summary', methods=['GET'])
+@error_handler
+def get_account_summary(account_id: str):
+    """Get summary statistics for an account"""
+    simulate_network_delay()
+    rate_limit()
+    
+    data = current_data()
+    
+    # Validate account exists
+    if account_id not in data.accounts:
+        raise APIError(f"Account not found: {account_id}", 404)
+    
+    cached = not_modified(data.accounts[account_id].digest)
+    if cached:
+        return cached
+    
+    # Summary statistics are precomputed when the dataset is loaded
+    summary = {
+        'account_id': account_id,
+        **summary_fields(data.summaries[account_id]),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+    
+    log_request(account=account_id)
+    
+    return jsonify(summary)
+
+@app.route('/accounts/<account_id>/ledger', methods=['GET'])
+@error_handler
+def get_account_ledger(account_id: str):
+    """Get the deduplicated final-state transactions for an account"""
+    simulate_network_delay()
+    rate_limit()
+    
+    data = current_data()
+    
+    # Validate account exists
+    if account_id not in data.accounts:
+        raise APIError(f"Account not found: {account_id}", 404)
     
-    # Calculate pagination
-    total_count = len(account_transactions)
+    page, per_page = parse_pagination()
+    
+    # The ledger is built and encoded when the dataset is loaded
+    ledger = data.accounts[account_id].ledger
+    total_count = len(ledger)
     start_index = (page - 1) * per_page
     end_index = start_index + per_page
     
     if start_index >= total_count and total_count > 0:
         raise APIError(f"Page {page} is beyond available data", 404)
     
-    # Get page data
-    page_transactions = account_transactions[start_index:end_index]
+    cached = not_modified(data.accounts[account_id].digest)
+    if cached:
+        return cached
     
-    # Calculate pagination metadata
-    has_next = end_index < total_count
-    has_prev = page > 1
-    total_pages = (total_count + per_page - 1) // per_page
+    summary = data.summaries[account_id]
     
-    logger.info(f"Returning page {page} of transactions for account {account_id[:8]}... ({len(page_transactions)} records)")
+    log_request(account=account_id, page=page)
     
     response_data = {
-        'transactions': page_transactions,
+        'account_id': account_id,
+        'booked_count': summary['ledger_booked'],
+        'pending_count': summary['ledger_pending'],
         'pagination': {
             'page': page,
             'per_page': per_page,
             'total_count': total_count,
-            'total_pages': total_pages,
-            'has_next': has_next,
-            'has_prev': has_prev
+            'total_pages': (total_count + per_page - 1) // per_page,
+            'has_next': end_index < total_count,
+            'has_prev': page > 1
         },
-        'account_id': account_id,
         'timestamp': datetime.utcnow().isoformat()
     }
     
-    return jsonify(response_data)
+    return json_response_with_array(
+        response_data, 'transactions', ledger.page_bytes(start_index, end_index),
+        cache_key=(account_id, data.accounts[account_id].digest, 'ledger', start_index, end_index)
+    )
 
-@app.route('/accounts/<account_id>/summary', methods=['GET'])
+@app.route('/accounts/<account_id>/balance', methods=['GET'])
 @error_handler
-def get_account_summary(account_id: str):
-    """Get summary statistics for an account"""
+def get_account_balance(account_id: str):
+    """Get the booked balance for an account, optionally as of a given date"""
     simulate_network_delay()
     rate_limit()
     
+    data = current_data()
+    
     # Validate account exists
-    if account_id not in accounts_cache:
+    if account_id not in data.accounts:
         raise APIError(f"Account not found: {account_id}", 404)
     
-    account_transactions = transactions_by_account.get(account_id, [])
+    as_of = request.args.get('as_of')
+    if as_of is not None:
+        as_of_day = date_to_int(as_of)
+        if not as_of_day:
+            raise APIError("Invalid as_of date, expected YYYY-MM-DD", 400)
+    else:
+        as_of_day = None
+    
+    cached = not_modified(data.accounts[account_id].digest)
+    if cached:
+        return cached
     
-    # Calculate summary statistics
-    total_records = len(account_transactions)
-    total_pending = sum(len(tx['payload'].get('pending', [])) for tx in account_transactions)
-    total_booked = sum(len(tx['payload'].get('booked', [])) for tx in account_transactions)
+    # Running balances are prefix sums over the booked ledger, so each
+    # currency is a single bisect
+    balances = {}
+    for currency, series in data.accounts[account_id].balances.items():
+        amount, last_day = series.as_of(as_of_day)
+        balances[currency] = {
+            'balance': f"{amount:f}",
+            'last_booking_date': int_to_date(last_day)
+        }
     
-    # Date range
-    if account_transactions:
-        first_transaction = account_transactions[0]['metadata']['createdAt']
-        last_transaction = account_transactions[-1]['metadata']['createdAt']
-    else:
-        first_transaction = last_transaction = None
+    log_request(account=account_id)
     
-    summary = {
+    return jsonify({
         'account_id': account_id,
-        'total_transaction_records': total_records,
-        'total_pending_transactions': total_pending,
-        'total_booked_transactions': total_booked,
-        'date_range': {
-            'first_transaction': first_transaction,
-            'last_transaction': last_transaction
-        },
+        'as_of': int_to_date(as_of_day) if as_of_day else None,
+        'balances': balances,
         'timestamp': datetime.utcnow().isoformat()
-    }
+    })
+
+@app.route('/transactions/export', methods=['GET'])
+@error_handler
+def export_transactions():
+    """Stream transaction records for many accounts as newline-delimited JSON"""
+    simulate_network_delay()
+    rate_limit()
     
-    logger.info(f"Returning summary for account {account_id[:8]}...")
+    data = current_data()
     
-    return jsonify(summary)
+    # Optional comma-separated account filter; defaults to every account
+    accounts_param = request.args.get('accounts')
+    if accounts_param:
+        # Repeated IDs are exported once, in order of first mention
+        account_ids = list(dict.fromkeys(account_id for account_id in accounts_param.split(',') if account_id))
+        for account_id in account_ids:
+            if account_id not in data.accounts:
+                raise APIError(f"Account not found: {account_id}", 404)
+    else:
+        account_ids = data.account_ids
+    
+    since = parse_since()
+    
+    cached = not_modified(*(data.accounts[account_id].digest for account_id in account_ids))
+    if cached:
+        return cached
+    
+    # Resolve each account's starting record up front so the totals can be
+    # sent as headers before the body starts streaming
+    plan = []
+    total_count = 0
+    high_water_mark = since
+    for account_id in account_ids:
+        store = data.accounts[account_id]
+        start = store.index_after(since) if since is not None else 0
+        if start < len(store):
+            plan.append((store, start))
+            total_count += len(store) - start
+            last_created = store.created_at[-1]
+            if high_water_mark is None or last_created > high_water_mark:
+                high_water_mark = last_created
+    
+    log_request(accounts=len(account_ids), records=total_count)
+    
+    batch_size = CONFIG['export_batch_size']
+    
+    def generate():
+        for store, start in plan:
+            yield from store.iter_ndjson(start, batch_size)
+    
+    headers = {'X-Total-Count': str(total_count)}
+    if high_water_mark is not None:
+        headers['X-High-Water-Mark'] = high_water_mark
+    
+    return Response(generate(), mimetype='application/x-ndjson', headers=headers)
 
 @app.route('/stats', methods=['GET'])
 @error_handler
@@ -272,31 +1120,58 @@ def get_api_stats():
     """Get overall API statistics"""
     simulate_network_delay()
     
-    total_pending = sum(
-        len(tx['payload'].get('pending', []))
-        for tx in transaction_data
-    )
-    total_booked = sum(
-        len(tx['payload'].get('booked', []))
-        for tx in transaction_data
-    )
+    data = current_data()
+    
+    cached = not_modified(data.digest)
+    if cached:
+        return cached
     
     stats = {
-        'total_accounts': len(accounts_cache),
-        'total_transaction_records': len(transaction_data),
-        'total_pending_transactions': total_pending,
-        'total_booked_transactions': total_booked,
+        'total_accounts': len(data.account_ids),
+        **summary_fields(data.summary),
         'api_version': '1.0.0',
         'configuration': {
             'default_page_size': CONFIG['default_page_size'],
             'max_page_size': CONFIG['max_page_size'],
-            'base_delay': CONFIG['base_delay']
+            'base_delay': CONFIG['base_delay'],
+            'fault_profile': fault_profile.name if fault_profile else None
         },
         'timestamp': datetime.utcnow().isoformat()
     }
     
     return jsonify(stats)
 
+@app.route('/admin/reload', methods=['POST'])
+@error_handler
+def trigger_reload():
+    """Reload the dataset in the background without restarting workers"""
+    global seen_reload_trigger
+    
+    token = CONFIG['admin_token']
+    if not token:
+        raise APIError("Reload is disabled: the server has no ADMIN_TOKEN", 403)
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode('utf-8'), token.encode('utf-8')):
+        raise APIError("Invalid admin token", 403)
+    
+    if reload_lock.locked():
+        raise APIError("Reload already in progress", 409)
+    
+    # Touch the shared trigger so the watchers of the other workers reload
+    # too; this worker reloads right away and skips its own touch
+    with open(CONFIG['reload_trigger_path'], 'a'):
+        os.utime(CONFIG['reload_trigger_path'])
+    seen_reload_trigger = reload_trigger_signature()
+    
+    threading.Thread(target=reload_transaction_data, kwargs={'force': True}, daemon=True).start()
+    
+    logger.info(f"Reload requested, serving data generation {data_generation.number} until it completes")
+    
+    return jsonify({
+        'status': 'reloading',
+        'generation': data_generation.number,
+        'timestamp': datetime.utcnow().isoformat()
+    }), 202
+
 @app.errorhandler(404)
 def not_found(error):
     """Custom 404 handler"""
@@ -315,10 +1190,14 @@ def internal_error(error):
 
 # Load data when module is imported (for gunicorn workers)
 try:
-    load_transaction_data()
+    data_generation = load_transaction_data()
 except Exception as e:
     logger.error(f"Failed to load data on import: {e}")
 
+# Each worker watches the data path itself, so reloads need no restart
+if CONFIG['reload_interval'] > 0:
+    threading.Thread(target=watch_data_path, name='data-watcher', daemon=True).start()
+
 if __name__ == '__main__':
     try:
         logger.info("Starting Transaction API Server...")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Transaction API ASGI Server
+
+Serves the same Flask endpoints and data layer as app.py from an asyncio
+event loop. Handlers never sleep here: simulated latency is recorded while
+the handler runs and then awaited with asyncio.sleep before the response is
+sent, so thousands of slow requests can be in flight on one core instead of
+each pinning a sync worker thread. Once the delays are deferred the
+handlers are pure CPU work on pre-encoded data, so they run inline on the
+loop. For the same reason the in-flight gauge and the request duration are
+recorded here rather than in app.py's hooks, so they cover the awaited delay.
+
+Usage:
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000 --workers 4 asgi:app
+
+Running under gunicorn (rather than uvicorn --workers) gives the master's
+on_starting hook the chance to clear the previous run's metrics.
+"""
+
+import asyncio
+import io
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from app import app as flask_app, logger, DEFERRED_DELAY_KEY, METRICS_ROUTE_KEY, IN_FLIGHT, REQUEST_DURATION
+
+def build_environ(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    """Translate an ASGI HTTP scope into a WSGI environ (PEP 3333)"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        DEFERRED_DELAY_KEY: [],
+    }
+
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    return environ
+
+async def read_body(receive) -> bytes:
+    """Collect the full request body"""
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+async def lifespan(receive, send):
+    """Acknowledge startup/shutdown; the dataset is loaded when app.py is imported"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    """ASGI application wrapping the Flask app with asynchronous delay injection"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    # The in-flight count and request duration cover the deferred delay and
+    # sending the body, which the Flask hooks finish before
+    started = time.perf_counter()
+    IN_FLIGHT.inc()
+    environ: Dict[str, Any] = {}
+    response_start: List[Tuple[str, List[Tuple[str, str]]]] = []
+    try:
+        environ = build_environ(scope, await read_body(receive))
+
+        def start_response(status, headers, exc_info=None):
+            response_start[:] = [(status, headers)]
+
+        # Runs the handler with its delays deferred into the environ
+        result = flask_app(environ, start_response)
+        try:
+            delay = sum(environ[DEFERRED_DELAY_KEY])
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            status, headers = response_start[0]
+            await send({
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+            })
+
+            # Streamed bodies (e.g. /transactions/export) are sent chunk by chunk
+            for chunk in result:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        except Exception as e:
+            logger.error(f"Error sending ASGI response: {e}")
+            raise
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+    finally:
+        IN_FLIGHT.dec()
+        if response_start:
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                route=environ.get(METRICS_ROUTE_KEY, 'unmatched'),
+                method=scope['method'],
+                status=response_start[0][0].split(' ', 1)[0]
+            )
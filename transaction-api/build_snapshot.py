@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Transaction Snapshot Builder
+
+Converts a transaction export (JSON array or NDJSON, optionally gzip or
+zstd compressed) into the binary snapshot format that the Transaction API
+memory-maps on startup.
+
+Usage:
+    python build_snapshot.py [input] [output]
+
+Defaults to data/transactions.json -> data/transactions.snapshot. Point
+DATA_PATH at the snapshot to have every worker mmap it instead of parsing.
+"""
+
+import sys
+import time
+
+from dataset import build_dataset, write_snapshot
+
+def main():
+    """Build a snapshot from the given (or default) input file"""
+    input_path = sys.argv[1] if len(sys.argv) > 1 else 'data/transactions.json'
+    output_path = sys.argv[2] if len(sys.argv) > 2 else 'data/transactions.snapshot'
+
+    print(f"Reading transaction data from {input_path}")
+    started = time.perf_counter()
+    dataset = build_dataset(input_path)
+
+    print(f"Writing snapshot to {output_path}")
+    write_snapshot(dataset, output_path)
+
+    print(f"✅ Snapshot built in {time.perf_counter() - started:.2f}s")
+    print(f"  - {len(dataset.account_ids)} accounts")
+    print(f"  - {dataset.total_records} transaction records")
+    print(f"  - {dataset.total_pending} pending and {dataset.total_booked} booked transactions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Response Compression
+
+gzip and (when the zstandard package is installed) zstd encoding for
+Transaction API responses, plus an LRU of compressed page segments.
+
+A page body is a small per-request head (pagination, timestamp) and tail
+around a slice of pre-encoded records. The records slice is compressed once
+into a self-contained segment and cached; each request only compresses the
+head and tail and splices the three together:
+
+    gzip  raw deflate segments that each end in a sync flush concatenate
+          into one valid deflate stream; the CRC-32 in the gzip trailer is
+          computed over the uncompressed bytes, which is far cheaper than
+          compressing them again
+    zstd  each piece is a complete frame, and a zstd stream may hold any
+          number of frames
+"""
+
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Magic, deflate, no flags, no mtime, no extra flags, unknown OS
+GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+
+def available_encodings() -> List[str]:
+    """Content codings this server can produce, most preferred first"""
+    return ['zstd', 'gzip'] if zstandard is not None else ['gzip']
+
+def _deflate_segment(data: bytes, final: bool) -> bytes:
+    """Raw deflate data that can be followed by further segments unless final"""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a whole body"""
+    if encoding == 'gzip':
+        return b''.join([
+            GZIP_HEADER,
+            _deflate_segment(data, final=True),
+            struct.pack('<II', zlib.crc32(data), len(data) & 0xffffffff)
+        ])
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+def iter_compressed(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Compress a streamed body, flushing after every chunk so clients see data as it is produced"""
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush(zlib.Z_FINISH)
+    else:
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        yield compressor.flush()
+
+class PageCompressor:
+    """Compresses spliced page bodies, keeping the compressed record segments in an LRU"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._segments: 'OrderedDict[Tuple, bytes]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _segment(self, key: Tuple, items: memoryview, encoding: str) -> bytes:
+        """Compressed form of items, from the cache when possible"""
+        with self._lock:
+            segment = self._segments.get(key)
+            if segment is not None:
+                self._segments.move_to_end(key)
+                self.hits += 1
+                return segment
+            self.misses += 1
+
+        # Compress outside the lock; two threads racing on the same page
+        # just do the work twice
+        if encoding == 'gzip':
+            segment = _deflate_segment(items, final=False)
+        else:
+            segment = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(items)
+
+        if len(segment) <= self.max_bytes:
+            with self._lock:
+                if key not in self._segments:
+                    self._segments[key] = segment
+                    self._size += len(segment)
+                    while self._size > self.max_bytes:
+                        _, evicted = self._segments.popitem(last=False)
+                        self._size -= len(evicted)
+        return segment
+
+    def compress_page(self, key: Tuple, head: bytes, items: memoryview, tail: bytes, encoding: str) -> bytes:
+        """Compress head + items + tail, reusing the cached segment for items under key"""
+        segment = self._segment(key + (encoding,), items, encoding)
+
+        if encoding == 'gzip':
+            crc = zlib.crc32(tail, zlib.crc32(items, zlib.crc32(head)))
+            size = len(head) + len(items) + len(tail)
+            return b''.join([
+                GZIP_HEADER,
+                _deflate_segment(head, final=False),
+                segment,
+                _deflate_segment(tail, final=True),
+                struct.pack('<II', crc, size & 0xffffffff)
+            ])
+
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        return b''.join([compressor.compress(head), segment, compressor.compress(tail)])
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache occupancy and hit counts"""
+        with self._lock:
+            return {
+                'entries': len(self._segments),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
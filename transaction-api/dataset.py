@@ -0,0 +1,963 @@
+#!/usr/bin/env python3
+"""
+Transaction Dataset Storage
+
+Holds the transaction records served by the Transaction API as pre-encoded
+JSON in a handful of flat sections, ordered by account and then createdAt.
+The same layout is either built in memory from a JSON/NDJSON export or
+memory-mapped read-only from a binary snapshot, so every gunicorn worker
+can share one copy of the data through the OS page cache. Exports may be
+gzip or zstd compressed (zstd needs the zstandard package). A data directory
+holding one such file per group of accounts is loaded file by file, so a
+reload only reparses the files that changed.
+
+Snapshot layout:
+    8 bytes   magic (SNAPSHOT_MAGIC)
+    8 bytes   little-endian length of the JSON header that follows
+    N bytes   JSON header: format version, byte order, account index,
+              per-account summaries, balance series, filter index
+              partitions and content digests, and the
+              [offset, length] of every section
+    sections  each aligned to 8 bytes
+"""
+
+import os
+import io
+import gzip
+import json
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from decimal import Decimal, InvalidOperation, ROUND_CEILING, ROUND_FLOOR
+from operator import attrgetter, itemgetter
+from typing import BinaryIO, Dict, List, Any, Optional, Iterable, Iterator, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd-compressed exports are optional
+    zstandard = None
+
+SNAPSHOT_MAGIC = b'TXSNAP\x00\x01'
+SNAPSHOT_VERSION = 7
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Decimal places of the amounts in the filter index, and the value marking a
+# transaction without a usable amount
+FILTER_AMOUNT_SCALE = 4
+MISSING_AMOUNT = -2 ** 63
+
+# Files picked up when the data path is a directory
+DATA_FILE_SUFFIXES = (
+    '.json', '.ndjson', '.jsonl', '.snapshot',
+    '.json.gz', '.ndjson.gz', '.jsonl.gz', '.json.zst', '.ndjson.zst', '.jsonl.zst'
+)
+
+# Section name -> memoryview format of its elements
+SECTION_FORMATS = {
+    'records': 'B',          # Encoded records, each followed by a comma
+    'offsets': 'Q',          # Start of record i in 'records' (N + 1 entries)
+    'created': 'B',          # UTF-8 createdAt strings back to back
+    'created_offsets': 'Q',  # Start of createdAt i in 'created' (N + 1 entries)
+    'ledger': 'B',           # Encoded final-state ledger entries, each followed by a comma
+    'ledger_offsets': 'Q',   # Start of ledger entry i in 'ledger' (M + 1 entries)
+    'balance_dates': 'I',    # Booking dates (YYYYMMDD) of end-of-day balance points
+    'balance_totals': 'q',   # Running booked total at each point, in units of 10**-scale
+    'tx_dates': 'I',         # Booking date (YYYYMMDD, 0 if missing) of each indexed transaction
+    'tx_amounts': 'q',       # Its amount in units of 10**-FILTER_AMOUNT_SCALE (MISSING_AMOUNT if missing)
+    'tx_records': 'I',       # Index of the record holding it, within the account
+    'tx_positions': 'I',     # Its position in that record's booked/pending list
+}
+
+def encode_json(obj: Any) -> bytes:
+    """Encode an object exactly as jsonify would (sorted keys, compact separators)"""
+    return json.dumps(obj, ensure_ascii=True, sort_keys=True, separators=(',', ':')).encode('ascii')
+
+class StringTable:
+    """Read-only sequence of strings stored as one UTF-8 blob plus offsets"""
+    __slots__ = ('blob', 'offsets')
+
+    def __init__(self, blob: memoryview, offsets: memoryview):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('string table index out of range')
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], 'utf-8')
+
+class RecordBuffer:
+    """
+    Pre-encoded JSON objects stored back to back in a shared buffer, each
+    followed by a comma, so any contiguous page is one slice that drops
+    straight into a JSON array without re-encoding.
+    """
+    __slots__ = ('buffer', 'offsets')
+
+    def __init__(self, buffer: memoryview, offsets: memoryview):
+        self.buffer = buffer
+        self.offsets = offsets  # offsets[i] is where object i starts in buffer
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def page_bytes(self, start: int, end: int) -> memoryview:
+        """Comma-separated encoded objects in [start, end)"""
+        end = min(end, len(self))
+        if start >= end:
+            return memoryview(b'')
+        return self.buffer[self.offsets[start]:self.offsets[end] - 1]
+
+    def iter_ndjson(self, start: int = 0, batch_size: int = 256) -> Iterator[bytes]:
+        """Yield objects from start onwards as newline-terminated JSON, a batch at a time"""
+        offsets = self.offsets
+        buffer = self.buffer
+        for batch_start in range(start, len(self), batch_size):
+            batch_end = min(batch_start + batch_size, len(self))
+            lines = []
+            for i in range(batch_start, batch_end):
+                lines.append(buffer[offsets[i]:offsets[i + 1] - 1])
+                lines.append(b'\n')
+            yield b''.join(lines)
+
+class BalanceSeries:
+    """
+    End-of-day running balance for one account and currency.
+    totals[i] is the sum of every booked ledger amount up to and including
+    dates[i], held as an exact integer number of 10**-scale units.
+    """
+    __slots__ = ('scale', 'dates', 'totals')
+
+    def __init__(self, scale: int, dates: memoryview, totals: memoryview):
+        self.scale = scale
+        self.dates = dates
+        self.totals = totals
+
+    def as_of(self, day: Optional[int] = None) -> Tuple[Decimal, Optional[int]]:
+        """Balance at the end of day (YYYYMMDD, or latest if None) and the date of the last point used"""
+        index = len(self.dates) if day is None else bisect_right(self.dates, day)
+        if index == 0:
+            return Decimal(0).scaleb(-self.scale), None
+        return Decimal(self.totals[index - 1]).scaleb(-self.scale), self.dates[index - 1]
+
+def parse_amount(value: Any) -> Optional[Tuple[int, int]]:
+    """
+    Exact (units, scale) form of a decimal amount string, where the amount
+    is units * 10**-scale: "-3.64" -> (-364, 2). None if missing or invalid.
+    """
+    try:
+        amount = Decimal(value)
+    except (TypeError, ValueError, InvalidOperation):
+        return None
+    if not amount.is_finite():
+        return None
+    scale = max(-amount.as_tuple().exponent, 0)
+    return int(amount.scaleb(scale)), scale
+
+def rescale(units: int, scale: int, target: int) -> int:
+    """Express units * 10**-scale in units of 10**-target (truncating if target < scale)"""
+    if target >= scale:
+        return units * 10 ** (target - scale)
+    divisor = 10 ** (scale - target)
+    return units // divisor if units >= 0 else -(-units // divisor)
+
+class Transaction:
+    """
+    One booked or pending transaction reduced to the typed fields the loader
+    aggregates and indexes on. Built once per transaction while an account
+    is packed; the full transaction only lives on as encoded record bytes.
+    """
+    __slots__ = ('status', 'code', 'currency', 'units', 'scale', 'day', 'record', 'position')
+
+    def __init__(self, status: str, raw: Dict[str, Any], record: int, position: int):
+        self.status = status
+        # Interned, since a handful of codes and currencies repeat everywhere
+        self.code = sys.intern(raw.get('proprietaryBankTransactionCode') or '')
+        amount = raw.get('transactionAmount') or {}
+        self.currency = sys.intern(amount.get('currency', 'UNKNOWN'))
+        parsed = parse_amount(amount.get('amount'))
+        self.units, self.scale = parsed if parsed is not None else (None, 0)
+        self.day = date_to_int(raw.get('bookingDate'))  # YYYYMMDD, 0 if missing
+        self.record = record  # Index of the record within its account
+        self.position = position  # Index within the record's booked/pending list
+
+def record_transactions(record: Dict[str, Any], record_index: int) -> List[Transaction]:
+    """Typed view of every booked and pending transaction in a record"""
+    return [
+        Transaction(status, raw, record_index, position)
+        for status in ('booked', 'pending')
+        for position, raw in enumerate(record['payload'].get(status, []))
+    ]
+
+def filter_amount(transaction: Transaction) -> int:
+    """Amount as stored in the filter index: FILTER_AMOUNT_SCALE units, or MISSING_AMOUNT"""
+    if transaction.units is None:
+        return MISSING_AMOUNT
+    amount = rescale(transaction.units, transaction.scale, FILTER_AMOUNT_SCALE)
+    return amount if MISSING_AMOUNT < amount < 2 ** 63 else MISSING_AMOUNT
+
+def amount_bound(value: Decimal, upper: bool) -> int:
+    """Filter bound in index units; rounds inwards so the comparison stays exact"""
+    scaled = value.scaleb(FILTER_AMOUNT_SCALE)
+    return int(scaled.to_integral_value(rounding=ROUND_FLOOR if upper else ROUND_CEILING))
+
+class TransactionIndex:
+    """
+    Secondary index over the booked and pending transactions inside one
+    account's records. There is one partition per (status, bank transaction
+    code), sorted by booking date, with parallel amount, record and position
+    arrays, so a filtered lookup is a bisect per partition plus a scan of
+    the transactions in the date range.
+    """
+    __slots__ = ('partitions',)
+
+    def __init__(self, partitions: Dict[Tuple[str, str], Tuple[memoryview, memoryview, memoryview, memoryview]]):
+        # (status, code) -> (dates, amounts, records, positions)
+        self.partitions = partitions
+
+    def match(self, status: Optional[str] = None, codes: Optional[List[str]] = None,
+              date_from: int = 0, date_to: int = 0,
+              amount_min: Optional[int] = None, amount_max: Optional[int] = None) -> Dict[int, Dict[str, List[int]]]:
+        """
+        Transactions passing every given filter, as record index ->
+        {status: positions in the record's list, ascending}. Dates are
+        YYYYMMDD ints and amounts amount_bound() ints, with inclusive
+        bounds; 0 or None leaves a bound open.
+        """
+        if codes is not None:
+            statuses = [status] if status else ['booked', 'pending']
+            keys = [(s, code) for s in statuses for code in codes if (s, code) in self.partitions]
+        else:
+            keys = [key for key in self.partitions if not status or key[0] == status]
+
+        matches: Dict[int, Dict[str, List[int]]] = {}
+        for key in keys:
+            dates, amounts, records, positions = self.partitions[key]
+            # Transactions without a booking date never match a date filter
+            lo = bisect_left(dates, max(date_from, 1)) if date_from or date_to else 0
+            hi = bisect_right(dates, date_to) if date_to else len(dates)
+            for i in range(lo, hi):
+                if amount_min is not None or amount_max is not None:
+                    amount = amounts[i]
+                    if amount == MISSING_AMOUNT:
+                        continue
+                    if amount_min is not None and amount < amount_min:
+                        continue
+                    if amount_max is not None and amount > amount_max:
+                        continue
+                matches.setdefault(records[i], {}).setdefault(key[0], []).append(positions[i])
+
+        for by_status in matches.values():
+            for matched in by_status.values():
+                matched.sort()
+        return matches
+
+class AccountPageStore(RecordBuffer):
+    """
+    Pre-encoded transaction records for one account, sorted by createdAt,
+    plus the account's deduplicated final-state ledger and running balances.
+    """
+    __slots__ = ('created_at', 'ledger', 'balances', 'digest', 'transactions')
+
+    def __init__(self, buffer: memoryview, offsets: memoryview, created_at: StringTable,
+                 ledger: RecordBuffer, balances: Dict[str, BalanceSeries], digest: str,
+                 transactions: TransactionIndex):
+        super().__init__(buffer, offsets)
+        self.created_at = created_at
+        self.ledger = ledger
+        self.balances = balances  # currency -> BalanceSeries
+        self.digest = digest  # Hash of the account's encoded records; changes iff they do
+        self.transactions = transactions  # Filter index over the records' transactions
+
+    def index_after(self, created_at: str) -> int:
+        """Index of the first record created strictly after created_at"""
+        return bisect_right(self.created_at, created_at)
+
+    def keyset_position(self, index: int) -> Tuple[str, int]:
+        """
+        Describe the position just before record index in createdAt terms:
+        the createdAt of the previous record and how many records sharing
+        that createdAt come before index. Unlike a raw offset this stays
+        meaningful if records are added elsewhere in the account.
+        """
+        created_at = self.created_at[index - 1]
+        return created_at, index - bisect_left(self.created_at, created_at)
+
+    def index_from_keyset(self, created_at: str, seen: int) -> int:
+        """Resolve a keyset_position back to a record index in O(log n)"""
+        first = bisect_left(self.created_at, created_at)
+        return min(first + seen, bisect_right(self.created_at, created_at, lo=first))
+
+def new_digest():
+    """Hash used for account and dataset content digests"""
+    return hashlib.blake2b(digest_size=12)
+
+def combine_digests(account_digests: Dict[str, str]) -> str:
+    """Digest of a whole dataset from its per-account digests"""
+    digest = new_digest()
+    for account_id in sorted(account_digests):
+        digest.update(f"{account_id}:{account_digests[account_id]};".encode('utf-8'))
+    return digest.hexdigest()
+
+def composite_key(transaction: Dict[str, Any]) -> str:
+    """
+    Identify a transaction by amount, currency, booking date and creditor.
+    Mirrors TransactionParser._create_transaction_key in
+    scripts/anonymize_data.py without the transactionId part, so a pending
+    entry without an ID can still be matched to its booked version.
+    """
+    key_parts = []
+
+    if 'transactionAmount' in transaction:
+        amount = transaction['transactionAmount'].get('amount', '')
+        currency = transaction['transactionAmount'].get('currency', '')
+        key_parts.append(f"amount:{amount}:{currency}")
+
+    if 'bookingDate' in transaction:
+        key_parts.append(f"date:{transaction['bookingDate']}")
+
+    if 'creditorName' in transaction:
+        key_parts.append(f"creditor:{transaction['creditorName']}")
+
+    # If no identifying fields, use a hash of the entire transaction
+    if not key_parts:
+        tx_str = json.dumps(transaction, sort_keys=True)
+        return f"hash:{hashlib.md5(tx_str.encode()).hexdigest()}"
+
+    return "|".join(key_parts)
+
+def transaction_key(transaction: Dict[str, Any]) -> str:
+    """Identity of a transaction: its transactionId when present, else its composite key"""
+    if 'transactionId' in transaction:
+        return f"id:{transaction['transactionId']}"
+    return composite_key(transaction)
+
+def _ledger_sort_key(entry: Dict[str, Any]) -> Tuple[str, str, str]:
+    return (entry.get('bookingDate', ''), entry.get('bookingDateTime', ''), entry['firstSeenAt'])
+
+def build_ledger(records: Iterable[Tuple[str, Dict[str, Any], List[Transaction]]]
+                 ) -> Tuple[List[Dict[str, Any]], List[Tuple[int, Transaction]]]:
+    """
+    Collapse one account's records, in createdAt order, into its final state.
+    Each record comes with its record_transactions() views.
+
+    Booked transactions are deduplicated by transaction_key, keeping the
+    latest version seen. Pending transactions are taken from the newest
+    record only, since that is the bank's current pending list; anything
+    that has since been booked (same transactionId or composite key) is
+    dropped as superseded. Entries are the raw transaction plus status and
+    first/last-seen createdAt, ordered by booking date.
+
+    Also returns (balance day, Transaction) for every booked entry, for
+    build_balance_points; the day falls back to valueDate when there is no
+    bookingDate.
+    """
+    booked: Dict[str, Dict[str, Any]] = {}
+    booked_views: Dict[str, Tuple[int, Transaction]] = {}
+    first_seen: Dict[str, str] = {}
+    latest_pending: List[Dict[str, Any]] = []
+    latest_created = None
+
+    for created_at, record, views in records:
+        # record_transactions lists the booked views first, in payload order
+        for transaction, view in zip(record['payload'].get('booked', []), views):
+            key = transaction_key(transaction)
+            first_seen.setdefault(key, created_at)
+            booked[key] = {
+                **transaction,
+                'status': 'booked',
+                'firstSeenAt': first_seen[key],
+                'lastSeenAt': created_at
+            }
+            booked_views[key] = (date_to_int(transaction.get('bookingDate') or transaction.get('valueDate')), view)
+        for transaction in record['payload'].get('pending', []):
+            first_seen.setdefault('pending|' + transaction_key(transaction), created_at)
+        latest_pending = record['payload'].get('pending', [])
+        latest_created = created_at
+
+    booked_composites = {composite_key(entry) for entry in booked.values()}
+    pending: Dict[str, Dict[str, Any]] = {}
+    for transaction in latest_pending:
+        key = transaction_key(transaction)
+        if key in booked or composite_key(transaction) in booked_composites:
+            continue
+        pending[key] = {
+            **transaction,
+            'status': 'pending',
+            'firstSeenAt': first_seen['pending|' + key],
+            'lastSeenAt': latest_created
+        }
+
+    return sorted([*booked.values(), *pending.values()], key=_ledger_sort_key), list(booked_views.values())
+
+def date_to_int(value: Optional[str]) -> int:
+    """Pack an ISO date (or the date part of a datetime) into YYYYMMDD; 0 if missing or malformed"""
+    try:
+        day = date.fromisoformat(value[:10])
+    except (TypeError, ValueError):
+        return 0
+    return day.year * 10000 + day.month * 100 + day.day
+
+def int_to_date(value: int) -> Optional[str]:
+    """Inverse of date_to_int"""
+    if not value:
+        return None
+    return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
+
+def build_balance_points(booked: Iterable[Tuple[int, Transaction]]) -> Dict[str, Tuple[int, List[Tuple[int, int]]]]:
+    """
+    Running booked balance per currency from the ledger's booked entries,
+    given as (YYYYMMDD, Transaction) pairs from build_ledger.
+    Returns currency -> (scale, [(YYYYMMDD, running total)]) with one point
+    per booking date. Amounts are summed as integers scaled by the largest
+    number of decimal places seen, so no precision is lost.
+    """
+    amounts: Dict[str, List[Tuple[int, int, int]]] = {}
+    for day, transaction in booked:
+        if transaction.units is None:
+            continue
+        amounts.setdefault(transaction.currency, []).append((day, transaction.units, transaction.scale))
+
+    series = {}
+    for currency, values in sorted(amounts.items()):
+        values.sort(key=itemgetter(0))
+        scale = max(value_scale for _, _, value_scale in values)
+        points: List[Tuple[int, int]] = []
+        running = 0
+        for day, units, value_scale in values:
+            running += rescale(units, value_scale, scale)
+            if points and points[-1][0] == day:
+                points[-1] = (day, running)
+            else:
+                points.append((day, running))
+        series[currency] = (scale, points)
+    return series
+
+def new_summary() -> Dict[str, Any]:
+    """Empty aggregate for one account (or the whole dataset)"""
+    return {
+        'records': 0,
+        'pending': 0,
+        'booked': 0,
+        'first_created': None,
+        'last_created': None,
+        'first_booking_date': None,
+        'last_booking_date': None,
+        'amounts': {},  # currency -> {'pending': total, 'booked': total}
+        'ledger_pending': 0,  # Entries in the final-state ledger
+        'ledger_booked': 0
+    }
+
+def _earliest(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    return b if a is None or (b is not None and b < a) else a
+
+def _latest(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    return b if a is None or (b is not None and b > a) else a
+
+def _currency_totals(amounts: Dict[str, Any], currency: str) -> Dict[str, List[int]]:
+    # status -> [units, scale], kept at the largest scale seen
+    return amounts.setdefault(currency, {'pending': [0, 0], 'booked': [0, 0]})
+
+def _add_units(total: List[int], units: int, scale: int):
+    if scale > total[1]:
+        total[0] = rescale(total[0], total[1], scale)
+        total[1] = scale
+    total[0] += rescale(units, scale, total[1])
+
+def _add_booking_day(summary: Dict[str, Any], day: int):
+    # Booking dates are YYYYMMDD ints until the summary is finalized
+    if not summary['first_booking_date'] or day < summary['first_booking_date']:
+        summary['first_booking_date'] = day
+    if not summary['last_booking_date'] or day > summary['last_booking_date']:
+        summary['last_booking_date'] = day
+
+def add_to_summary(summary: Dict[str, Any], created_at: str, transactions: List[Transaction]):
+    """Fold one record's typed transactions into a summary, summing amounts as exact integers"""
+    summary['records'] += 1
+    summary['first_created'] = _earliest(summary['first_created'], created_at)
+    summary['last_created'] = _latest(summary['last_created'], created_at)
+
+    amounts = summary['amounts']
+    for transaction in transactions:
+        summary[transaction.status] += 1
+
+        if transaction.day:
+            _add_booking_day(summary, transaction.day)
+
+        if transaction.units is not None:
+            _add_units(_currency_totals(amounts, transaction.currency)[transaction.status],
+                       transaction.units, transaction.scale)
+
+def finalize_summary(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Render integer totals and day ints as strings so the summary is JSON-ready"""
+    summary['first_booking_date'] = int_to_date(summary['first_booking_date'])
+    summary['last_booking_date'] = int_to_date(summary['last_booking_date'])
+    summary['amounts'] = {
+        currency: {status: str(Decimal(units).scaleb(-scale)) for status, (units, scale) in totals.items()}
+        for currency, totals in sorted(summary['amounts'].items())
+    }
+    return summary
+
+def merge_summaries(summaries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine finalized summaries into one covering all of them"""
+    merged = new_summary()
+    for summary in summaries:
+        for key in ('records', 'pending', 'booked', 'ledger_pending', 'ledger_booked'):
+            merged[key] += summary[key]
+        merged['first_created'] = _earliest(merged['first_created'], summary['first_created'])
+        merged['last_created'] = _latest(merged['last_created'], summary['last_created'])
+        for key in ('first_booking_date', 'last_booking_date'):
+            day = date_to_int(summary[key])
+            if day:
+                _add_booking_day(merged, day)
+        for currency, totals in summary['amounts'].items():
+            merged_totals = _currency_totals(merged['amounts'], currency)
+            for status, total in totals.items():
+                _add_units(merged_totals[status], *parse_amount(total))
+    return finalize_summary(merged)
+
+class Dataset:
+    """All transaction records plus the per-account views and summaries over them"""
+
+    def __init__(self, sections: Dict[str, memoryview], account_index: List[Tuple[str, int, int, int, int]],
+                 source_format: str, summaries: Dict[str, Dict[str, Any]],
+                 balance_index: Dict[str, List[Tuple[str, int, int, int]]], digests: Dict[str, str],
+                 filter_index: Dict[str, List[Tuple[str, str, int, int]]]):
+        self.sections = sections
+        # (account_id, first record, record count, first ledger entry, ledger count), sorted by id
+        self.account_index = account_index
+        self.source_format = source_format
+        self.summaries = summaries
+        # account_id -> [(currency, scale, first balance point, point count)]
+        self.balance_index = balance_index
+        # account_id -> content digest; the dataset digest identifies the whole generation
+        self.digests = digests
+        self.digest = combine_digests(digests)
+        # account_id -> [(status, code, first indexed transaction, count)]
+        self.filter_index = filter_index
+        self.summary = merge_summaries(summaries.values())
+        self.total_records = self.summary['records']
+        self.total_pending = self.summary['pending']
+        self.total_booked = self.summary['booked']
+
+        records = sections['records']
+        offsets = sections['offsets']
+        created = sections['created']
+        created_offsets = sections['created_offsets']
+        ledger = sections['ledger']
+        ledger_offsets = sections['ledger_offsets']
+        balance_dates = sections['balance_dates']
+        balance_totals = sections['balance_totals']
+        tx_sections = [sections[name] for name in ('tx_dates', 'tx_amounts', 'tx_records', 'tx_positions')]
+
+        self.accounts: Dict[str, AccountPageStore] = {}
+        for account_id, first, count, ledger_first, ledger_count in account_index:
+            end = first + count
+            ledger_end = ledger_first + ledger_count
+            balances = {
+                currency: BalanceSeries(
+                    scale,
+                    balance_dates[point_first:point_first + point_count],
+                    balance_totals[point_first:point_first + point_count]
+                )
+                for currency, scale, point_first, point_count in balance_index.get(account_id, [])
+            }
+            transactions = TransactionIndex({
+                (status, code): tuple(section[tx_first:tx_first + tx_count] for section in tx_sections)
+                for status, code, tx_first, tx_count in filter_index.get(account_id, [])
+            })
+            self.accounts[account_id] = AccountPageStore(
+                records,
+                offsets[first:end + 1],
+                StringTable(created, created_offsets[first:end + 1]),
+                RecordBuffer(ledger, ledger_offsets[ledger_first:ledger_end + 1]),
+                balances,
+                digests[account_id],
+                transactions
+            )
+        self.account_ids: List[str] = [entry[0] for entry in account_index]
+
+def sniff_compression(path: str) -> Optional[str]:
+    """'gzip' or 'zstd' for a compressed data file, None otherwise"""
+    with open(path, 'rb') as f:
+        head = f.read(len(ZSTD_MAGIC))
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head == ZSTD_MAGIC:
+        return 'zstd'
+    return None
+
+def open_data_file(path: str) -> BinaryIO:
+    """Binary stream of a JSON/NDJSON export's content, decompressing it if needed"""
+    compression = sniff_compression(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed; install zstandard to load it")
+        # Appended exports hold one frame per append
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True)
+    return open(path, 'rb')
+
+def sniff_data_format(path: str) -> str:
+    """Detect whether a data file is a snapshot, a JSON array or NDJSON (compressed or not)"""
+    with open(path, 'rb') as f:
+        if f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC:
+            return 'snapshot'
+    with open_data_file(path) as f:
+        while True:
+            char = f.read(1)
+            if not char or not char.isspace():
+                return 'json' if char == b'[' else 'ndjson'
+
+def iter_transaction_records(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Stream transaction records from a JSON array or NDJSON file, either of
+    which may be compressed. Only one chunk of the file plus the record
+    being decoded is held in memory, so peak usage tracks the parsed index
+    rather than the file size.
+    """
+    with io.TextIOWrapper(open_data_file(path), encoding='utf-8') as f:
+        if sniff_data_format(path) == 'ndjson':
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+
+        decoder = json.JSONDecoder()
+        buffer = f.read(chunk_size)
+        pos = 0
+        eof = not buffer
+
+        def fill():
+            # Drop consumed text and append the next chunk
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            eof = not chunk
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        # Opening bracket of the top-level array
+        skip_whitespace()
+        pos += 1
+        skip_whitespace()
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+
+        while True:
+            skip_whitespace()
+            while True:
+                try:
+                    record, pos = decoder.raw_decode(buffer, pos)
+                    break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+            yield record
+
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            if buffer[pos] == ']':
+                return
+            if buffer[pos] != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            pos += 1
+
+def build_dataset(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dataset:
+    """
+    Stream a JSON/NDJSON export into the in-memory section layout.
+    Each record is encoded to bytes as soon as it is parsed and the dict is
+    dropped, so neither the raw file nor the parsed objects stay in memory.
+    """
+    source_format = sniff_data_format(path)
+    by_account: Dict[str, List[tuple]] = {}
+    summaries: Dict[str, Dict[str, Any]] = {}
+
+    for tx_record in iter_transaction_records(path, chunk_size):
+        account_id = tx_record['metadata']['accountId']
+        by_account.setdefault(account_id, []).append(
+            (tx_record['metadata']['createdAt'], encode_json(tx_record))
+        )
+
+    records = bytearray()
+    offsets = array('Q', [0])
+    created = bytearray()
+    created_offsets = array('Q', [0])
+    ledger = bytearray()
+    ledger_offsets = array('Q', [0])
+    balance_dates = array('I')
+    balance_totals = array('q')
+    account_index = []
+    balance_index: Dict[str, List[Tuple[str, int, int, int]]] = {}
+    tx_dates = array('I')
+    tx_amounts = array('q')
+    tx_records = array('I')
+    tx_positions = array('I')
+    filter_index: Dict[str, List[Tuple[str, str, int, int]]] = {}
+    digests: Dict[str, str] = {}
+    record_count = 0
+    ledger_count = 0
+
+    # Sort accounts for deterministic results and transactions by timestamp
+    # within each account, releasing each account's entries once packed
+    for account_id in sorted(by_account):
+        entries = by_account.pop(account_id)
+        entries.sort(key=itemgetter(0))
+
+        # Records are decoded again one at a time for the ledger, the
+        # summary and the filter index; beyond the account's ledger entries
+        # only the slotted Transaction views are held
+        summary = summaries[account_id] = new_summary()
+        transactions: List[Transaction] = []
+
+        def decoded_records():
+            for record_index, (created_at, encoded) in enumerate(entries):
+                record = json.loads(encoded)
+                parsed = record_transactions(record, record_index)
+                add_to_summary(summary, created_at, parsed)
+                transactions.extend(parsed)
+                yield created_at, record, parsed
+
+        account_ledger, booked_entries = build_ledger(decoded_records())
+
+        account_index.append((account_id, record_count, len(entries), ledger_count, len(account_ledger)))
+        record_count += len(entries)
+        ledger_count += len(account_ledger)
+
+        for entry in account_ledger:
+            summary['ledger_' + entry['status']] += 1
+        finalize_summary(summary)
+
+        digest = new_digest()
+        for created_at, encoded in entries:
+            digest.update(encoded)
+            records += encoded
+            records += b','
+            offsets.append(len(records))
+            created += created_at.encode('utf-8')
+            created_offsets.append(len(created))
+        digests[account_id] = digest.hexdigest()
+
+        for entry in account_ledger:
+            ledger += encode_json(entry)
+            ledger += b','
+            ledger_offsets.append(len(ledger))
+
+        balance_index[account_id] = []
+        for currency, (scale, points) in build_balance_points(booked_entries).items():
+            balance_index[account_id].append((currency, scale, len(balance_dates), len(points)))
+            for day, total in points:
+                balance_dates.append(day)
+                balance_totals.append(total)
+
+        # Partition by (status, code), each sorted by booking date
+        transactions.sort(key=attrgetter('status', 'code', 'day', 'record', 'position'))
+        filter_index[account_id] = []
+        partition_key = None
+        for transaction in transactions:
+            if (transaction.status, transaction.code) != partition_key:
+                partition_key = (transaction.status, transaction.code)
+                filter_index[account_id].append([transaction.status, transaction.code, len(tx_dates), 0])
+            filter_index[account_id][-1][3] += 1
+            tx_dates.append(transaction.day)
+            tx_amounts.append(filter_amount(transaction))
+            tx_records.append(transaction.record)
+            tx_positions.append(transaction.position)
+        filter_index[account_id] = [tuple(partition) for partition in filter_index[account_id]]
+
+    sections = {
+        'records': memoryview(records),
+        'offsets': memoryview(offsets),
+        'created': memoryview(created),
+        'created_offsets': memoryview(created_offsets),
+        'ledger': memoryview(ledger),
+        'ledger_offsets': memoryview(ledger_offsets),
+        'balance_dates': memoryview(balance_dates),
+        'balance_totals': memoryview(balance_totals),
+        'tx_dates': memoryview(tx_dates),
+        'tx_amounts': memoryview(tx_amounts),
+        'tx_records': memoryview(tx_records),
+        'tx_positions': memoryview(tx_positions),
+    }
+    return Dataset(sections, account_index, source_format, summaries, balance_index, digests, filter_index)
+
+def write_snapshot(dataset: Dataset, path: str):
+    """Write a dataset to a binary snapshot that open_snapshot can mmap"""
+    layout = {}
+    position = 0
+    for name in SECTION_FORMATS:
+        length = dataset.sections[name].nbytes
+        layout[name] = [position, length]
+        position += (length + 7) // 8 * 8
+
+    header = json.dumps({
+        'version': SNAPSHOT_VERSION,
+        'byteorder': sys.byteorder,
+        'source_format': dataset.source_format,
+        'accounts': dataset.account_index,
+        'summaries': dataset.summaries,
+        'balances': dataset.balance_index,
+        'digests': dataset.digests,
+        'filters': dataset.filter_index,
+        'sections': layout
+    }).encode('utf-8')
+
+    # Pad the header so the first section starts 8-byte aligned
+    prefix_length = len(SNAPSHOT_MAGIC) + 8 + len(header)
+    header += b' ' * (-prefix_length % 8)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for name in SECTION_FORMATS:
+            data = dataset.sections[name].cast('B')
+            f.write(data)
+            f.write(b'\0' * (-len(data) % 8))
+    os.replace(tmp_path, path)
+
+def open_snapshot(path: str) -> Dataset:
+    """Memory-map a snapshot read-only; no record data is read up front"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    if view[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError(f"Not a transaction snapshot: {path}")
+
+    header_start = len(SNAPSHOT_MAGIC) + 8
+    (header_length,) = struct.unpack_from('<Q', view, len(SNAPSHOT_MAGIC))
+    header = json.loads(bytes(view[header_start:header_start + header_length]))
+
+    if header['version'] != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {header['version']} in {path}")
+    if header['byteorder'] != sys.byteorder:
+        raise ValueError(f"Snapshot {path} was built on a {header['byteorder']}-endian machine")
+
+    data_start = header_start + header_length
+    sections = {}
+    for name, fmt in SECTION_FORMATS.items():
+        offset, length = header['sections'][name]
+        section = view[data_start + offset:data_start + offset + length]
+        sections[name] = section.cast(fmt) if fmt != 'B' else section
+
+    account_index = [tuple(entry) for entry in header['accounts']]
+    balance_index = {
+        account_id: [tuple(entry) for entry in entries]
+        for account_id, entries in header['balances'].items()
+    }
+    filter_index = {
+        account_id: [tuple(entry) for entry in entries]
+        for account_id, entries in header['filters'].items()
+    }
+    return Dataset(sections, account_index, 'snapshot', header['summaries'], balance_index, header['digests'],
+                   filter_index)
+
+class DatasetCollection:
+    """
+    Datasets loaded from the files of a data directory, served as one.
+    Each file must hold complete accounts; an account split across files
+    is rejected rather than silently shadowed.
+    """
+
+    def __init__(self, parts: Dict[str, Tuple[Tuple[int, int], Dataset]], reparsed: List[str]):
+        # file path -> (file signature, dataset loaded from it)
+        self.parts = parts
+        # Files parsed for this collection (the rest were reused)
+        self.reparsed = reparsed
+
+        self.accounts: Dict[str, AccountPageStore] = {}
+        self.summaries: Dict[str, Dict[str, Any]] = {}
+        self.digests: Dict[str, str] = {}
+        for path, (_, part) in sorted(parts.items()):
+            for account_id, store in part.accounts.items():
+                if account_id in self.accounts:
+                    raise ValueError(f"Account {account_id} appears in more than one data file (again in {path})")
+                self.accounts[account_id] = store
+                self.summaries[account_id] = part.summaries[account_id]
+                self.digests[account_id] = part.digests[account_id]
+
+        self.account_ids: List[str] = sorted(self.accounts)
+        self.digest = combine_digests(self.digests)
+        self.summary = merge_summaries(self.summaries.values())
+        self.total_records = self.summary['records']
+        self.total_pending = self.summary['pending']
+        self.total_booked = self.summary['booked']
+
+        formats = {part.source_format for _, part in parts.values()}
+        self.source_format = formats.pop() if len(formats) == 1 else ('mixed' if formats else None)
+
+def file_signature(path: str) -> Tuple[int, int]:
+    """(mtime in ns, size) of a file, used to tell whether it changed"""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def list_data_files(path: str) -> Dict[str, Tuple[int, int]]:
+    """Transaction files directly inside a data directory, with their signatures"""
+    files = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(DATA_FILE_SUFFIXES):
+                stat = entry.stat()
+                files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def data_signature(path: str) -> Any:
+    """Cheap fingerprint of a data file or directory; changes whenever a reload would"""
+    if os.path.isdir(path):
+        return tuple(sorted(list_data_files(path).items()))
+    return file_signature(path)
+
+def load_data_directory(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        previous: Optional[DatasetCollection] = None) -> DatasetCollection:
+    """
+    Load every transaction file in a directory. Files whose signature
+    matches the previous collection are reused as-is, so a reload only
+    reparses the files (and therefore the accounts) that changed.
+    """
+    previous_parts = previous.parts if isinstance(previous, DatasetCollection) else {}
+    parts = {}
+    reparsed = []
+    for file_path, signature in sorted(list_data_files(path).items()):
+        reused = previous_parts.get(file_path)
+        if reused is not None and reused[0] == signature:
+            parts[file_path] = reused
+        else:
+            parts[file_path] = (signature, load_dataset(file_path, chunk_size))
+            reparsed.append(file_path)
+    return DatasetCollection(parts, reparsed)
+
+def load_dataset(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, previous: Any = None) -> Any:
+    """
+    Open a snapshot, stream a JSON/NDJSON export, or load a directory of
+    either, depending on what path is. previous (an earlier result for the
+    same path) lets a directory reload skip unchanged files.
+    """
+    if os.path.isdir(path):
+        return load_data_directory(path, chunk_size, previous)
+    if sniff_data_format(path) == 'snapshot':
+        return open_snapshot(path)
+    return build_dataset(path, chunk_size)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Latency and Fault Injection Profiles
+
+Named profiles describe how the Transaction API misbehaves: the latency
+distribution, per-endpoint error rates and error bursts, occasional stalls
+and truncated response bodies. Profiles are loaded from a JSON file (see
+fault_profiles.json) and selected with the FAULT_PROFILE setting.
+
+Every decision for a request is drawn from one random.Random. When the
+client sends an X-Fault-Key header the generator is seeded from the
+profile seed plus that key, so a request with the same key always gets the
+same latency and faults on any worker. Without the header a per-process
+generator seeded from the profile seed is used; that is repeatable for a
+single worker and a sequential client.
+
+Profile fields (all optional):
+    seed        integer seed (default 0)
+    latency     {"distribution": "uniform", "min": s, "max": s}
+                {"distribution": "lognormal", "median": s, "sigma": x, "max": s}
+                {"distribution": "pareto", "scale": s, "alpha": x, "max": s}
+                {"distribution": "fixed", "seconds": s}
+    errors      {"rate": {"default": p, "<route rule>": p, ...},
+                 "statuses": [500, 502, 503],
+                 "burst_probability": p, "burst_length": n, "burst_rate": p}
+    stall       {"probability": p, "seconds": s}
+    truncate    {"probability": p, "routes": ["<route rule>", ...]}
+"""
+
+import json
+import math
+import random
+import threading
+from typing import Dict, Any, List, Optional
+
+class FaultProfile:
+    """One named latency/fault profile"""
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.seed = spec.get('seed', 0)
+        self.latency_spec = spec.get('latency', {'distribution': 'fixed', 'seconds': 0})
+
+        errors = spec.get('errors', {})
+        self.error_rates: Dict[str, float] = errors.get('rate', {})
+        self.error_statuses: List[int] = errors.get('statuses', [500, 502, 503])
+        self.burst_probability = errors.get('burst_probability', 0.0)
+        self.burst_length = errors.get('burst_length', 0)
+        self.burst_rate = errors.get('burst_rate', 1.0)
+
+        stall = spec.get('stall', {})
+        self.stall_probability = stall.get('probability', 0.0)
+        self.stall_seconds = stall.get('seconds', 0.0)
+
+        truncate = spec.get('truncate', {})
+        self.truncate_probability = truncate.get('probability', 0.0)
+        self.truncate_routes = set(truncate.get('routes', []))
+
+        if self.latency_spec.get('distribution') not in ('uniform', 'lognormal', 'pareto', 'fixed'):
+            raise ValueError(f"Unknown latency distribution in fault profile {name}: "
+                             f"{self.latency_spec.get('distribution')}")
+
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._burst_remaining = 0
+
+    def request_rng(self, fault_key: Optional[str] = None) -> random.Random:
+        """Generator for one request's decisions"""
+        if fault_key is not None:
+            return random.Random(f"{self.seed}:{fault_key}")
+        # Draw a child seed under the lock so concurrent requests don't
+        # interleave draws from the shared generator
+        with self._lock:
+            return random.Random(self._rng.getrandbits(64))
+
+    def latency(self, rng: random.Random) -> float:
+        """Simulated network latency in seconds"""
+        spec = self.latency_spec
+        distribution = spec['distribution']
+        if distribution == 'uniform':
+            value = rng.uniform(spec.get('min', 0.0), spec.get('max', 0.0))
+        elif distribution == 'lognormal':
+            value = rng.lognormvariate(math.log(spec['median']), spec.get('sigma', 0.5))
+        elif distribution == 'pareto':
+            value = spec['scale'] * rng.paretovariate(spec.get('alpha', 1.5))
+        else:
+            value = spec.get('seconds', 0.0)
+        return min(value, spec.get('max', value))
+
+    def stall(self, rng: random.Random) -> float:
+        """Extra seconds to hang for, or 0"""
+        if self.stall_probability and rng.random() < self.stall_probability:
+            return self.stall_seconds
+        return 0.0
+
+    def error_status(self, rng: random.Random, route: str) -> Optional[int]:
+        """HTTP status to fail the request with, or None to serve it"""
+        rate = self.error_rates.get(route, self.error_rates.get('default', 0.0))
+
+        if self.burst_length:
+            # Bursts are shared by all requests on this worker
+            with self._lock:
+                if self._burst_remaining == 0 and rng.random() < self.burst_probability:
+                    self._burst_remaining = self.burst_length
+                if self._burst_remaining:
+                    self._burst_remaining -= 1
+                    rate = max(rate, self.burst_rate)
+
+        if rate and rng.random() < rate:
+            return rng.choice(self.error_statuses)
+        return None
+
+    def truncate_at(self, rng: random.Random, route: str, length: int) -> Optional[int]:
+        """Byte length to cut a response body to, or None to send it whole"""
+        if self.truncate_routes and route not in self.truncate_routes:
+            return None
+        if length > 1 and self.truncate_probability and rng.random() < self.truncate_probability:
+            return rng.randrange(1, length)
+        return None
+
+def load_profile(path: str, name: str) -> FaultProfile:
+    """Load one named profile from a JSON profiles file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        profiles = json.load(f)
+    if name not in profiles:
+        raise ValueError(f"Fault profile {name!r} not found in {path} (available: {', '.join(sorted(profiles))})")
+    return FaultProfile(name, profiles[name])
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Response Projection and Encodings
+
+Field projection and the alternative response formats of the transaction
+pages. Fields are dotted paths into a transaction record, e.g.
+metadata.createdAt or payload.booked.transactionAmount. A path step over a
+list applies to every element, and * matches every key of an object, so
+payload.*.bookingDate covers both booked and pending transactions.
+
+Formats, negotiated from the Accept header:
+    application/json                              the usual document
+    application/msgpack                           the same document as
+                                                  MessagePack (needs msgpack)
+    application/vnd.transaction-api.columnar+json one array per field, one
+                                                  entry per record
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # MessagePack responses are optional
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+COLUMNAR_MIMETYPE = 'application/vnd.transaction-api.columnar+json'
+
+# Accepted media type -> response format
+MEDIA_TYPES = {
+    JSON_MIMETYPE: 'json',
+    MSGPACK_MIMETYPE: 'msgpack',
+    'application/x-msgpack': 'msgpack',
+    COLUMNAR_MIMETYPE: 'columnar',
+}
+
+# Response format -> Content-Type sent
+FORMAT_MIMETYPES = {
+    'json': JSON_MIMETYPE,
+    'msgpack': MSGPACK_MIMETYPE,
+    'columnar': COLUMNAR_MIMETYPE,
+}
+
+# Columns of a columnar page when no fields are requested
+DEFAULT_COLUMNS = (('metadata',), ('payload',))
+
+FieldPath = Tuple[str, ...]
+
+def available_media_types() -> List[str]:
+    """Media types that can be served, JSON first so it wins for */*"""
+    return [
+        media_type for media_type, response_format in MEDIA_TYPES.items()
+        if response_format != 'msgpack' or msgpack is not None
+    ]
+
+def parse_fields(value: str) -> List[FieldPath]:
+    """Parse a comma-separated fields parameter; raises ValueError if malformed"""
+    paths = []
+    for field in value.split(','):
+        path = tuple(field.strip().split('.'))
+        if not all(path):
+            raise ValueError(f"Invalid field: {field.strip()!r}")
+        if path not in paths:
+            paths.append(path)
+    if not paths:
+        raise ValueError("No fields given")
+    return paths
+
+def _build_tree(paths: List[FieldPath]) -> Dict[str, Any]:
+    """Nest paths into a tree of key -> subtree, where None selects the whole value"""
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        node = tree
+        for step in path[:-1]:
+            child = node.get(step, {})
+            if child is None:
+                break  # An ancestor is already selected whole
+            node = node.setdefault(step, child)
+        else:
+            node[path[-1]] = None
+    return tree
+
+def _merge_trees(a: Optional[Dict[str, Any]], b: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if a is None or b is None:
+        return None
+    merged = dict(a)
+    for key, subtree in b.items():
+        merged[key] = _merge_trees(merged[key], subtree) if key in merged else subtree
+    return merged
+
+def _project(value: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [_project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return None
+
+    wildcard = tree.get('*', {})
+    projected = {}
+    for key, item in value.items():
+        if key in tree:
+            subtree = _merge_trees(tree[key], wildcard) if '*' in tree else tree[key]
+        elif '*' in tree:
+            subtree = wildcard
+        else:
+            continue
+        projected[key] = _project(item, subtree)
+    return projected
+
+def project(records: List[Dict[str, Any]], paths: List[FieldPath]) -> List[Dict[str, Any]]:
+    """Reduce each record to the given fields, keeping its nesting"""
+    tree = _build_tree(paths)
+    return [_project(record, tree) for record in records]
+
+def extract(value: Any, path: FieldPath) -> Any:
+    """Value at path; lists map over their elements, * maps over object keys, missing is None"""
+    if not path:
+        return value
+    if isinstance(value, list):
+        return [extract(item, path) for item in value]
+    if not isinstance(value, dict):
+        return None
+    step, rest = path[0], path[1:]
+    if step == '*':
+        return {key: extract(item, rest) for key, item in value.items()}
+    return extract(value.get(step), rest)
+
+def to_columns(records: List[Dict[str, Any]], paths: Optional[List[FieldPath]]) -> Dict[str, List[Any]]:
+    """Columnar layout: one array per field with an entry per record"""
+    return {
+        '.'.join(path): [extract(record, path) for record in records]
+        for path in (paths or DEFAULT_COLUMNS)
+    }
+
+def encode_msgpack(document: Dict[str, Any]) -> bytes:
+    """MessagePack encoding of a response document"""
+    return msgpack.packb(document, use_bin_type=True)
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Gunicorn Settings
+
+Server hooks for the Transaction API; pass with -c gunicorn.conf.py (the
+Dockerfile's CMD does). Command-line options still set the bind address,
+worker count and timeouts.
+"""
+
+import os
+
+import metrics
+
+def on_starting(server):
+    """Runs once in the master before any worker starts"""
+    # Workers' metric files outlive the process; without this, counters
+    # from the previous run would be summed into this run's totals
+    metrics.clear_directory(os.getenv('METRICS_DIR', metrics.DEFAULT_DIRECTORY))
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Prometheus Metrics
+
+Counters, gauges and histograms that aggregate across gunicorn/uvicorn
+workers. Each process writes its own memory-mapped file in a shared
+directory, so updates never contend across processes; a scrape of any
+worker reads every file in the directory and merges them into the Prometheus
+text exposition format.
+
+File layout:
+    16 bytes  header: magic, bytes used, pid
+    entries   key length, value count, key (padded to 8 bytes), float64 values
+
+Entries are appended as new label combinations are seen, and the header's
+used length is written last so a concurrent reader never sees half an
+entry. Counters and histograms of exited workers keep counting towards the
+totals; gauges only count processes that are still alive. The server's
+master calls clear_directory() once before starting workers (gunicorn's
+on_starting hook in gunicorn.conf.py), so totals from an earlier run are
+not carried over.
+"""
+
+import os
+import mmap
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_DIRECTORY = '/tmp/transaction-api-metrics'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def format_value(value: float) -> str:
+    """Sample value as Prometheus expects it: shortest exact form, +Inf/-Inf/NaN spelled out"""
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+def _is_store_file(filename: str) -> bool:
+    return filename.startswith('metrics-') and filename.endswith('.bin')
+
+def clear_directory(directory: str):
+    """Remove the store files of an earlier run; call before any worker has written"""
+    os.makedirs(directory, exist_ok=True)
+    for filename in os.listdir(directory):
+        if _is_store_file(filename):
+            try:
+                os.remove(os.path.join(directory, filename))
+            except FileNotFoundError:
+                pass
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class ProcessStore:
+    """The metric values of one process, in a mmap'd file only that process writes"""
+
+    MAGIC = b'TXMETR\x00\x01'
+    HEADER = struct.Struct('<8sII')
+    ENTRY = struct.Struct('<II')
+    INITIAL_SIZE = 1 << 16
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.ftruncate(self._fd, self.INITIAL_SIZE)
+        self._map = mmap.mmap(self._fd, self.INITIAL_SIZE, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        self._used = self.HEADER.size
+        self._offsets: Dict[str, int] = {}  # key -> byte offset of its first value
+        self.HEADER.pack_into(self._map, 0, self.MAGIC, self._used, os.getpid())
+
+    def _append(self, key: str, count: int) -> int:
+        encoded = key.encode('utf-8')
+        padded = (len(encoded) + 7) & ~7
+        size = self.ENTRY.size + padded + 8 * count
+        if self._used + size > len(self._map):
+            new_size = max(len(self._map) * 2, self._used + size)
+            os.ftruncate(self._fd, new_size)
+            self._map.resize(new_size)
+
+        offset = self._used
+        self.ENTRY.pack_into(self._map, offset, len(encoded), count)
+        self._map[offset + self.ENTRY.size:offset + self.ENTRY.size + len(encoded)] = encoded
+        values_offset = offset + self.ENTRY.size + padded
+        self._map[values_offset:values_offset + 8 * count] = bytes(8 * count)
+
+        # Publish the entry only once it is complete
+        self._used += size
+        struct.pack_into('<I', self._map, 8, self._used)
+        self._offsets[key] = values_offset
+        return values_offset
+
+    def offset(self, key: str, count: int) -> int:
+        """Offset of key's values, adding zeroed values the first time it is seen"""
+        offset = self._offsets.get(key)
+        return offset if offset is not None else self._append(key, count)
+
+    def add(self, offset: int, amount: float):
+        self._map[offset:offset + 8] = struct.pack('<d', struct.unpack_from('<d', self._map, offset)[0] + amount)
+
+    def set(self, offset: int, value: float):
+        struct.pack_into('<d', self._map, offset, value)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+def read_store(path: str) -> Tuple[int, Iterator[Tuple[str, Tuple[float, ...]]]]:
+    """pid and (key, values) entries of a store file written by any process"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < ProcessStore.HEADER.size:
+        return 0, iter(())
+    magic, used, pid = ProcessStore.HEADER.unpack_from(data, 0)
+    if magic != ProcessStore.MAGIC:
+        return 0, iter(())
+
+    def entries():
+        offset = ProcessStore.HEADER.size
+        while offset + ProcessStore.ENTRY.size <= min(used, len(data)):
+            key_length, count = ProcessStore.ENTRY.unpack_from(data, offset)
+            key_offset = offset + ProcessStore.ENTRY.size
+            values_offset = key_offset + ((key_length + 7) & ~7)
+            yield (
+                data[key_offset:key_offset + key_length].decode('utf-8'),
+                struct.unpack_from(f'<{count}d', data, values_offset)
+            )
+            offset = values_offset + 8 * count
+
+    return pid, entries()
+
+class Metric:
+    """A named metric family; samples are keyed by name and rendered label pairs"""
+
+    kind = ''
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        registry.metrics[name] = self
+
+    @property
+    def slots(self) -> int:
+        return 1
+
+    def _key(self, labels: Dict[str, str]) -> str:
+        rendered = ','.join(f'{name}="{_escape(str(labels[name]))}"' for name in self.labelnames)
+        return f"{self.name}\x00{rendered}"
+
+    def render(self, labels: str, values: Sequence[float]) -> List[str]:
+        return [f"{self.name}{{{labels}}} {format_value(values[0])}" if labels else
+                f"{self.name} {format_value(values[0])}"]
+
+class Counter(Metric):
+    """Monotonic total, summed over every process that ever wrote it"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        self.registry.add(self._key(labels), self.slots, 0, amount)
+
+class Gauge(Metric):
+    """Current value, summed over the processes still alive"""
+
+    kind = 'gauge'
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        self.registry.add(self._key(labels), self.slots, 0, amount)
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.registry.add(self._key(labels), self.slots, 0, -amount)
+
+    def set(self, value: float, **labels: str):
+        self.registry.set(self._key(labels), self.slots, 0, value)
+
+class Histogram(Metric):
+    """Observations counted into buckets; the values are per-bucket counts followed by the sum"""
+
+    kind = 'histogram'
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, documentation: str,
+                 labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    @property
+    def slots(self) -> int:
+        return len(self.buckets) + 1
+
+    def observe(self, value: float, **labels: str):
+        bucket = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        self.registry.observe(self._key(labels), self.slots, bucket, value)
+
+    def render(self, labels: str, values: Sequence[float]) -> List[str]:
+        separator = ',' if labels else ''
+        lines = []
+        cumulative = 0.0
+        for bound, count in zip(self.buckets, values):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{{labels}{separator}le="{format_value(bound)}"}} {format_value(cumulative)}')
+        braces = f"{{{labels}}}" if labels else ''
+        lines.append(f"{self.name}_sum{braces} {format_value(values[-1])}")
+        lines.append(f"{self.name}_count{braces} {format_value(cumulative)}")
+        return lines
+
+class MetricsRegistry:
+    """The metric families of the application and this process's store in the shared directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        self._store: Optional[ProcessStore] = None
+        self._pid: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return Counter(self, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return Gauge(self, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return Histogram(self, name, documentation, labelnames, buckets)
+
+    def _process_store(self) -> ProcessStore:
+        # A worker forked after the registry was created gets a file of its own
+        pid = os.getpid()
+        if self._pid != pid:
+            self._store = ProcessStore(os.path.join(self.directory, f"metrics-{pid}.bin"))
+            self._pid = pid
+        return self._store
+
+    def add(self, key: str, slots: int, slot: int, amount: float):
+        with self._lock:
+            store = self._process_store()
+            store.add(store.offset(key, slots) + 8 * slot, amount)
+
+    def set(self, key: str, slots: int, slot: int, value: float):
+        with self._lock:
+            store = self._process_store()
+            store.set(store.offset(key, slots) + 8 * slot, value)
+
+    def observe(self, key: str, slots: int, bucket: int, value: float):
+        with self._lock:
+            store = self._process_store()
+            offset = store.offset(key, slots)
+            store.add(offset + 8 * bucket, 1.0)
+            store.add(offset + 8 * (slots - 1), value)
+
+    def collect(self) -> Dict[str, Dict[str, List[float]]]:
+        """metric name -> rendered labels -> values merged over every process file"""
+        merged: Dict[str, Dict[str, List[float]]] = {}
+        for filename in sorted(os.listdir(self.directory)):
+            if not _is_store_file(filename):
+                continue
+            try:
+                pid, entries = read_store(os.path.join(self.directory, filename))
+                alive = _pid_alive(pid) if pid else False
+                for key, values in entries:
+                    name, labels = key.split('\x00', 1)
+                    metric = self.metrics.get(name)
+                    if metric is None or len(values) != metric.slots:
+                        continue  # Written by a different version of the application
+                    if metric.kind == 'gauge' and not alive:
+                        continue
+                    totals = merged.setdefault(name, {}).setdefault(labels, [0.0] * len(values))
+                    for i, value in enumerate(values):
+                        totals[i] += value
+            except FileNotFoundError:
+                continue  # Removed while scraping
+        return merged
+
+    def exposition(self) -> str:
+        """All metrics in the Prometheus text format"""
+        merged = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, values in sorted(merged.get(name, {}).items()):
+                lines.extend(metric.render(labels, values))
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Token Bucket Rate Limiter
+
+Per-client token buckets kept in a small memory-mapped file, so every
+gunicorn worker (and every thread within it) draws from the same budget.
+Updates are serialized with an flock on the file plus a thread lock, since
+flock alone does not exclude threads sharing one file descriptor.
+
+File layout:
+    16 bytes  header: magic, slot count
+    slots     (key hash, tokens, last update time), 24 bytes each
+
+Buckets live in an open-addressed table. A client whose probe window is
+full takes over the least recently used slot there; any bucket idle long
+enough to be evicted would have refilled to capacity anyway.
+"""
+
+import os
+import time
+import fcntl
+import hashlib
+import mmap
+import struct
+import threading
+from typing import NamedTuple
+
+class RateLimitDecision(NamedTuple):
+    """Outcome of one request against a client's bucket"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # Seconds until one token is available (0 if allowed)
+    reset_after: float  # Seconds until the bucket is full again
+
+class TokenBucketLimiter:
+    """Token bucket per client key, shared across processes through a mmap'd file"""
+
+    MAGIC = b'TXRATE\x00\x01'
+    HEADER = struct.Struct('<8sI4x')
+    SLOT = struct.Struct('<Qdd')
+    PROBE_LIMIT = 16
+
+    def __init__(self, path: str, capacity: int, refill_rate: float, slots: int = 4096):
+        if capacity < 1:
+            raise ValueError(f"Rate limit capacity must be at least 1, got {capacity}")
+        # Retry-After is computed by dividing by the refill rate
+        if not refill_rate > 0:
+            raise ValueError(f"Rate limit refill rate must be positive, got {refill_rate}")
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.slots = slots
+        self._lock = threading.Lock()
+
+        size = self.HEADER.size + slots * self.SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        # Initialize (or reset a mismatched) table under the file lock so
+        # workers starting together agree on the layout
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(self._fd, self.HEADER.size, 0)
+            if len(header) < self.HEADER.size or self.HEADER.unpack(header) != (self.MAGIC, slots):
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, self.HEADER.pack(self.MAGIC, slots), 0)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self._table = mmap.mmap(self._fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # 0 marks an empty slot, so force the low bit on
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') | 1
+
+    def _find_slot(self, key_hash: int) -> int:
+        """Byte offset of the slot holding key_hash, an empty slot, or the stalest one in range"""
+        start = key_hash % self.slots
+        stalest_offset = None
+        stalest_time = None
+
+        for probe in range(self.PROBE_LIMIT):
+            offset = self.HEADER.size + (start + probe) % self.slots * self.SLOT.size
+            stored_hash, _, updated = self.SLOT.unpack_from(self._table, offset)
+            if stored_hash == key_hash or stored_hash == 0:
+                return offset
+            if stalest_time is None or updated < stalest_time:
+                stalest_offset, stalest_time = offset, updated
+
+        return stalest_offset
+
+    def acquire(self, key: str) -> RateLimitDecision:
+        """Take one token from key's bucket if available"""
+        key_hash = self._hash(key)
+        now = time.time()
+
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                offset = self._find_slot(key_hash)
+                stored_hash, tokens, updated = self.SLOT.unpack_from(self._table, offset)
+                if stored_hash != key_hash:
+                    tokens, updated = float(self.capacity), now
+
+                tokens = min(float(self.capacity), tokens + max(now - updated, 0.0) * self.refill_rate)
+                allowed = tokens >= 1.0
+                if allowed:
+                    tokens -= 1.0
+
+                self.SLOT.pack_into(self._table, offset, key_hash, tokens, now)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=self.capacity,
+            remaining=int(tokens),
+            retry_after=0.0 if allowed else (1.0 - tokens) / self.refill_rate,
+            reset_after=(self.capacity - tokens) / self.refill_rate
+        )
@@ -0,0 +1,73 @@
+"""Shared fixtures: small transaction exports written in each supported layout"""
+
+import os
+import sys
+import gzip
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _make_record(account_id: str, created_at: str, booked: List[tuple] = (), pending: List[tuple] = ()) -> Dict[str, Any]:
+    """A transaction record; booked/pending entries are (transaction id, amount, booking date, code)"""
+    def transaction(tx_id, amount, booking_date, code):
+        tx = {
+            'bookingDate': booking_date,
+            'transactionAmount': {'amount': amount, 'currency': 'GBP'},
+            'proprietaryBankTransactionCode': code,
+            'remittanceInformationUnstructured': f"REF {tx_id}"
+        }
+        if tx_id:
+            tx['transactionId'] = tx_id
+        return tx
+
+    return {
+        'metadata': {'accountId': account_id, 'createdAt': created_at},
+        'payload': {
+            'booked': [transaction(*entry) for entry in booked],
+            'pending': [transaction(*entry) for entry in pending]
+        }
+    }
+
+@pytest.fixture
+def records() -> List[Dict[str, Any]]:
+    """Three accounts with pending -> booked transitions, repeats and out-of-order createdAt"""
+    return [
+        _make_record('acc-b', '2025-07-02T09:00:00.000Z',
+                    booked=[('b1', '-12.50', '2025-07-01', 'POS'), ('b2', '100.00', '2025-07-02', 'BAC')],
+                    pending=[(None, '-3.10', '2025-07-02', 'POS')]),
+        _make_record('acc-a', '2025-07-01T08:00:00.000Z',
+                    pending=[(None, '-4.61', '2025-07-01', 'POS')]),
+        _make_record('acc-a', '2025-07-03T08:00:00.000Z',
+                    booked=[('a1', '-4.61', '2025-07-01', 'POS'), ('a2', '1500', '2025-07-03', 'BAC')]),
+        _make_record('acc-b', '2025-07-01T09:00:00.000Z',
+                    booked=[('b1', '-12.50', '2025-07-01', 'POS')]),
+        _make_record('acc-c', '2025-07-05T10:30:00.000Z',
+                    booked=[('c1', '0.005', '2025-07-04', 'DD'), ('c2', '-0.01', '2025-07-05', 'DD')]),
+    ]
+
+def _write_json(path: str, records: List[Dict[str, Any]]) -> str:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2)
+    return path
+
+def _write_ndjson(path: str, records: List[Dict[str, Any]]) -> str:
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+    return path
+
+@pytest.fixture
+def make_record():
+    return _make_record
+
+@pytest.fixture
+def write_json():
+    return _write_json
+
+@pytest.fixture
+def write_ndjson():
+    return _write_ndjson
@@ -0,0 +1,510 @@
+"""The Flask endpoints and their ASGI wrapper, served from the checked-in sample data"""
+
+import os
+import asyncio
+import gzip
+import base64
+import json
+import logging
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STATE_DIR = tempfile.mkdtemp(prefix='transaction-api-tests-')
+
+# Read once when app is imported
+os.environ.update(
+    DATA_PATH=os.path.join(REPO_ROOT, 'data', 'transactions_sample.json'),
+    BASE_DELAY='0',
+    MAX_DELAY='0',
+    RATE_LIMIT_CAPACITY='0',
+    ACCESS_LOG_SAMPLE_RATE='0',
+    METRICS_DIR=os.path.join(STATE_DIR, 'metrics'),
+    RELOAD_TRIGGER_PATH=os.path.join(STATE_DIR, 'reload')
+)
+
+import app as api
+import asgi
+from faults import FaultProfile
+
+@pytest.fixture
+def client():
+    return api.app.test_client()
+
+@pytest.fixture
+def account_id():
+    return api.data_generation.account_ids[0]
+
+@pytest.mark.parametrize('query', [
+    'amount_min=abc',
+    'amount_max=NaN',
+    'amount_min=Infinity',
+    'amount_min=1e999999999',
+    'amount_max=-1e999999999',
+])
+def test_invalid_amount_filters_are_rejected(client, account_id, query):
+    response = client.get(f"/accounts/{account_id}/transactions?{query}")
+
+    assert response.status_code == 400
+    assert 'expected a decimal number' in response.get_json()['error']
+
+@pytest.mark.parametrize('query', ['amount_min=1e30', 'amount_max=-1e30', 'amount_min=1e-999999999'])
+def test_extreme_amount_filters_are_accepted(client, account_id, query):
+    response = client.get(f"/accounts/{account_id}/transactions?{query}")
+
+    assert response.status_code == 200
+
+@pytest.mark.parametrize('query', [
+    'booking_date_from=',
+    'status=',
+    'amount_max=',
+    'transaction_code=',
+    'transaction_code=POS,,DD',
+])
+def test_empty_filter_values_are_rejected(client, account_id, query):
+    response = client.get(f"/accounts/{account_id}/transactions?{query}")
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Invalid ')
+
+def test_export_streams_every_record_as_ndjson(client):
+    response = client.get('/transactions/export')
+    lines = response.get_data().splitlines()
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert len(lines) == int(response.headers['X-Total-Count']) == api.data_generation.dataset.total_records
+    records = [json.loads(line) for line in lines]
+    account_ids = [record['metadata']['accountId'] for record in records]
+    assert list(dict.fromkeys(account_ids)) == api.data_generation.account_ids
+    assert response.headers['X-High-Water-Mark'] == max(record['metadata']['createdAt'] for record in records)
+
+def test_gzipped_export_decodes_to_the_plain_export(client):
+    plain = client.get('/transactions/export').get_data()
+    response = client.get('/transactions/export', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == plain
+
+def test_export_lists_each_requested_account_once(client):
+    first, second = api.data_generation.account_ids[:2]
+    response = client.get(f"/transactions/export?accounts={second},{first},{second}")
+    account_ids = [json.loads(line)['metadata']['accountId'] for line in response.get_data().splitlines()]
+
+    assert list(dict.fromkeys(account_ids)) == [second, first]
+    expected = len(api.data_generation.accounts[first]) + len(api.data_generation.accounts[second])
+    assert len(account_ids) == int(response.headers['X-Total-Count']) == expected
+
+def test_export_of_an_unknown_account_is_not_found(client, account_id):
+    response = client.get(f"/transactions/export?accounts={account_id},invalid-account-id")
+
+    assert response.status_code == 404
+    assert response.get_json()['error'] == 'Account not found: invalid-account-id'
+
+def since_variants(created_at):
+    """The same instant as a stored createdAt, written the ways clients send it"""
+    moment = datetime.fromisoformat(created_at)
+    return [
+        created_at,
+        created_at.replace('Z', '+00:00'),
+        moment.astimezone(timezone(timedelta(hours=2))).isoformat(timespec='milliseconds'),
+        moment.replace(tzinfo=None).isoformat(timespec='microseconds'),
+    ]
+
+def test_since_matches_the_same_instant_in_any_offset(client, account_id):
+    store = api.data_generation.accounts[account_id]
+    created_at = store.created_at[len(store) // 2]
+    expected = len(store) - store.index_after(created_at)
+
+    for since in since_variants(created_at):
+        response = client.get(f"/accounts/{account_id}/transactions", query_string={'since': since})
+        body = response.get_json()
+
+        assert body['pagination']['total_count'] == expected, since
+        assert body['since'] == created_at
+        assert all(record['metadata']['createdAt'] > created_at for record in body['transactions'])
+
+def test_export_since_matches_the_same_instant_in_any_offset(client, account_id):
+    store = api.data_generation.accounts[account_id]
+    created_at = store.created_at[len(store) // 2]
+
+    for since in since_variants(created_at):
+        response = client.get('/transactions/export', query_string={'accounts': account_id, 'since': since})
+
+        assert int(response.headers['X-Total-Count']) == len(store) - store.index_after(created_at), since
+
+@pytest.mark.parametrize('since', ['yesterday', '2025-07-11T25:00:00Z', '0001-01-01T00:00:00+01:00'])
+def test_invalid_since_is_rejected(client, account_id, since):
+    response = client.get(f"/accounts/{account_id}/transactions", query_string={'since': since})
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid since timestamp, expected ISO 8601'
+
+def test_truncated_page_is_not_cached(client, account_id, monkeypatch):
+    url = f"/accounts/{account_id}/transactions"
+    whole = client.get(url)
+    monkeypatch.setattr(api, 'fault_profile', FaultProfile('truncating', {'truncate': {'probability': 1.0}}))
+
+    truncated = client.get(url)
+
+    assert len(truncated.get_data()) < len(whole.get_data())
+    assert 'ETag' not in truncated.headers
+    assert 'Cache-Control' not in truncated.headers
+    # A client holding the whole page still revalidates it
+    assert client.get(url, headers={'If-None-Match': whole.headers['ETag']}).status_code == 304
+
+@pytest.fixture
+def reload_started(monkeypatch):
+    """Set when /admin/reload starts a reload, which is recorded instead of run"""
+    started = threading.Event()
+    monkeypatch.setattr(api, 'reload_transaction_data', lambda force=False: started.set())
+    return started
+
+def test_reload_is_disabled_without_an_admin_token(client, reload_started):
+    response = client.post('/admin/reload')
+
+    assert response.status_code == 403
+    assert 'ADMIN_TOKEN' in response.get_json()['error']
+    assert not reload_started.is_set()
+
+@pytest.mark.parametrize('headers', [{}, {'X-Admin-Token': 'wrong'}, {'X-Admin-Token': 'sécret'}])
+def test_reload_with_a_wrong_admin_token_is_refused(client, reload_started, monkeypatch, headers):
+    monkeypatch.setitem(api.CONFIG, 'admin_token', 'secret')
+
+    response = client.post('/admin/reload', headers=headers)
+
+    assert response.status_code == 403
+    assert response.get_json()['error'] == 'Invalid admin token'
+    assert not reload_started.is_set()
+
+def test_reload_with_the_admin_token_starts(client, reload_started, monkeypatch):
+    monkeypatch.setitem(api.CONFIG, 'admin_token', 'secret')
+
+    response = client.post('/admin/reload', headers={'X-Admin-Token': 'secret'})
+
+    assert response.status_code == 202
+    assert reload_started.wait(5)
+
+# Fails every request with a 503
+FAILING_PROFILE = FaultProfile('failing', {'errors': {'rate': {'default': 1.0}, 'statuses': [503]}})
+
+@pytest.fixture
+def access_log_entries(monkeypatch):
+    """Entries queued to the access log, sampling every request"""
+    entries = []
+    monkeypatch.setattr(api.access_log, 'sample_rate', 1.0)
+    monkeypatch.setattr(api.access_log, 'write', entries.append)
+    return entries
+
+def test_access_log_records_the_request(client, account_id, access_log_entries):
+    client.get(f"/accounts/{account_id}/transactions?page=1&per_page=2")
+
+    entry, = access_log_entries
+    assert entry['route'] == '/accounts/<account_id>/transactions'
+    assert entry['status'] == 200
+    assert entry['query'] == 'page=1&per_page=2'
+    assert (entry['account'], entry['position'], entry['records']) == (account_id, 'page 1', 2)
+
+def test_access_log_samples_all_but_server_errors(client, account_id, access_log_entries, monkeypatch):
+    monkeypatch.setattr(api.access_log, 'sample_rate', 0.0)
+    client.get(f"/accounts/{account_id}/transactions")
+    client.get('/accounts/invalid-account-id/transactions')
+
+    monkeypatch.setattr(api, 'fault_profile', FAILING_PROFILE)
+    client.get(f"/accounts/{account_id}/transactions")
+
+    assert [(entry['status'], entry.get('error')) for entry in access_log_entries] == [(503, 'Injected fault (failing)')]
+
+def test_client_errors_are_not_logged_as_warnings(client, account_id, caplog, monkeypatch):
+    with caplog.at_level(logging.DEBUG, logger='app'):
+        client.get('/accounts/invalid-account-id/transactions')
+        monkeypatch.setattr(api, 'fault_profile', FAILING_PROFILE)
+        client.get(f"/accounts/{account_id}/transactions")
+
+    api_errors = [(record.levelno, record.getMessage()) for record in caplog.records if 'API Error' in record.getMessage()]
+    assert api_errors == [
+        (logging.DEBUG, 'API Error: Account not found: invalid-account-id'),
+        (logging.WARNING, 'API Error: Injected fault (failing)'),
+    ]
+
+def metric_values(name, labels=''):
+    """Merged values of one metric sample, or None if it hasn't been recorded"""
+    return api.metrics_registry.collect().get(name, {}).get(labels)
+
+async def asgi_get(path):
+    """Run one GET through the ASGI app; returns the response status"""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi.app({'type': 'http', 'method': 'GET', 'path': path, 'headers': []}, receive, send)
+    return messages[0]['status']
+
+def test_asgi_requests_stay_in_flight_until_the_delay_is_awaited(account_id, monkeypatch):
+    monkeypatch.setattr(api, 'fault_profile', FaultProfile('slow', {'latency': {'distribution': 'fixed', 'seconds': 0.2}}))
+    labels = 'route="/accounts/<account_id>/transactions",method="GET",status="200"'
+    before = metric_values('transaction_api_request_duration_seconds', labels) or [0.0]
+    in_flight = []
+
+    async def scenario():
+        requests = [asyncio.ensure_future(asgi_get(f"/accounts/{account_id}/transactions")) for _ in range(3)]
+        await asyncio.sleep(0.1)
+        in_flight.append(metric_values('transaction_api_requests_in_flight')[0])
+        return await asyncio.gather(*requests)
+
+    assert asyncio.run(scenario()) == [200, 200, 200]
+    assert in_flight == [3]
+    assert metric_values('transaction_api_requests_in_flight')[0] == 0
+    # Histogram values are the bucket counts followed by the sum
+    after = metric_values('transaction_api_request_duration_seconds', labels)
+    assert sum(after[:-1]) - sum(before[:-1]) == 3
+    assert after[-1] - before[-1] >= 0.6
+
+def walk_cursor(client, url, per_page):
+    """Every record reached by following next_cursor from the start"""
+    records, cursor = [], ''
+    while cursor is not None:
+        body = client.get(url, query_string={'after': cursor, 'per_page': per_page}).get_json()
+        records.extend(body['transactions'])
+        cursor = body['pagination']['next_cursor']
+    return records
+
+@pytest.mark.parametrize('per_page', [1, 2, 100])
+def test_cursor_pagination_walks_every_record_once(client, account_id, per_page):
+    url = f"/accounts/{account_id}/transactions"
+    everything = client.get(url, query_string={'per_page': 100}).get_json()['transactions']
+
+    assert len(everything) > 2
+    assert walk_cursor(client, url, per_page) == everything
+
+def test_page_cursor_resumes_where_the_page_ends(client, account_id):
+    url = f"/accounts/{account_id}/transactions"
+    first_page = client.get(url, query_string={'page': 1, 'per_page': 2}).get_json()
+    second_page = client.get(url, query_string={'page': 2, 'per_page': 2}).get_json()
+
+    resumed = client.get(url, query_string={'after': first_page['pagination']['next_cursor'], 'per_page': 2})
+
+    assert resumed.get_json()['transactions'] == second_page['transactions']
+
+@pytest.mark.parametrize('cursor', [
+    '!!!',
+    base64.urlsafe_b64encode(b'no separator').decode('ascii'),
+    base64.urlsafe_b64encode(b'2025-07-01T00:00:00.000Z|-1').decode('ascii'),
+    base64.urlsafe_b64encode(b'2025-07-01T00:00:00.000Z|x').decode('ascii'),
+    base64.urlsafe_b64encode(b'\xff\xfe|1').decode('ascii'),
+])
+def test_invalid_cursor_is_rejected(client, account_id, cursor):
+    response = client.get(f"/accounts/{account_id}/transactions", query_string={'after': cursor})
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor'
+
+def test_cursor_and_page_are_exclusive(client, account_id):
+    response = client.get(f"/accounts/{account_id}/transactions?after=&page=1")
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Use either page or after, not both'
+
+def ledger_entries(client, account_id):
+    """Every ledger entry of the account, one page after another"""
+    entries, page = [], 1
+    while True:
+        body = client.get(f"/accounts/{account_id}/ledger", query_string={'page': page, 'per_page': 3}).get_json()
+        entries.extend(body['transactions'])
+        if not body['pagination']['has_next']:
+            return body, entries
+        page += 1
+
+def sample_records(account_id):
+    """The account's records in the sample data, oldest first"""
+    with open(os.environ['DATA_PATH'], encoding='utf-8') as f:
+        records = [record for record in json.load(f) if record['metadata']['accountId'] == account_id]
+    return sorted(records, key=lambda record: record['metadata']['createdAt'])
+
+@pytest.mark.parametrize('index', [0, 3, 7])
+def test_ledger_holds_each_booked_transaction_once(client, index):
+    account_id = api.data_generation.account_ids[index]
+    records = sample_records(account_id)
+    booked_ids = {tx['transactionId'] for record in records for tx in record['payload'].get('booked', [])}
+
+    last_page, entries = ledger_entries(client, account_id)
+    booked = [entry for entry in entries if entry['status'] == 'booked']
+    pending = [entry for entry in entries if entry['status'] == 'pending']
+
+    assert len(entries) == last_page['pagination']['total_count']
+    assert (last_page['booked_count'], last_page['pending_count']) == (len(booked), len(pending))
+    assert sorted(entry['transactionId'] for entry in booked) == sorted(booked_ids)
+    # Pending entries are the newest record's, minus any already booked
+    newest_pending = records[-1]['payload'].get('pending', [])
+    assert all(entry['transactionId'] not in booked_ids for entry in pending if 'transactionId' in entry)
+    assert len(pending) <= len(newest_pending)
+    assert [entry['bookingDate'] for entry in booked] == sorted(entry['bookingDate'] for entry in booked)
+    for entry in entries:
+        assert entry['firstSeenAt'] <= entry['lastSeenAt']
+
+def test_ledger_page_beyond_the_end_is_not_found(client, account_id):
+    response = client.get(f"/accounts/{account_id}/ledger?page=999")
+
+    assert response.status_code == 404
+    assert response.get_json()['error'] == 'Page 999 is beyond available data'
+
+def test_ledger_of_an_unknown_account_is_not_found(client):
+    response = client.get('/accounts/invalid-account-id/ledger')
+
+    assert response.status_code == 404
+    assert response.get_json()['error'] == 'Account not found: invalid-account-id'
+
+def booked_total(entries, currency, until=None):
+    """Sum of the booked ledger entries in currency, up to and including the until date"""
+    return sum(
+        (Decimal(entry['transactionAmount']['amount']) for entry in entries
+         if entry['status'] == 'booked' and entry['transactionAmount']['currency'] == currency
+         and (until is None or (entry.get('bookingDate') or entry['valueDate']) <= until)),
+        Decimal(0)
+    )
+
+@pytest.mark.parametrize('index', [0, 3, 7])
+def test_balance_is_the_sum_of_the_booked_ledger(client, index):
+    account_id = api.data_generation.account_ids[index]
+    _, entries = ledger_entries(client, account_id)
+    days = sorted({entry['bookingDate'] for entry in entries if entry['status'] == 'booked'})
+
+    for as_of in [None, days[0], days[len(days) // 2], '1999-12-31']:
+        query = {'as_of': as_of} if as_of else {}
+        body = client.get(f"/accounts/{account_id}/balance", query_string=query).get_json()
+
+        assert body['as_of'] == as_of
+        for currency, balance in body['balances'].items():
+            assert Decimal(balance['balance']) == booked_total(entries, currency, as_of), (currency, as_of)
+            included = [day for day in days if as_of is None or day <= as_of]
+            assert balance['last_booking_date'] == (included[-1] if included else None)
+
+def test_balance_as_of_accepts_a_datetime(client, account_id):
+    by_date = client.get(f"/accounts/{account_id}/balance?as_of=2025-07-10").get_json()
+    by_datetime = client.get(f"/accounts/{account_id}/balance?as_of=2025-07-10T23:59:59Z").get_json()
+
+    assert by_datetime['as_of'] == '2025-07-10'
+    assert by_datetime['balances'] == by_date['balances']
+
+@pytest.mark.parametrize('as_of', ['', 'yesterday', '2025-13-01'])
+def test_invalid_balance_date_is_rejected(client, account_id, as_of):
+    response = client.get(f"/accounts/{account_id}/balance", query_string={'as_of': as_of})
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid as_of date, expected YYYY-MM-DD'
+
+def test_balance_of_an_unknown_account_is_not_found(client):
+    assert client.get('/accounts/invalid-account-id/balance').status_code == 404
+
+def without_timestamp(document):
+    return {key: value for key, value in document.items() if key != 'timestamp'}
+
+def test_fields_projection_keeps_only_the_requested_paths(client, account_id):
+    url = f"/accounts/{account_id}/transactions?per_page=5"
+    whole = client.get(url).get_json()['transactions']
+
+    projected = client.get(f"{url}&fields=metadata.createdAt,payload.*.transactionAmount.amount").get_json()
+
+    assert projected['transactions'] == [
+        {
+            'metadata': {'createdAt': record['metadata']['createdAt']},
+            'payload': {
+                status: [{'transactionAmount': {'amount': tx['transactionAmount']['amount']}} for tx in transactions]
+                for status, transactions in record['payload'].items()
+            }
+        }
+        for record in whole
+    ]
+
+@pytest.mark.parametrize('fields', ['', 'metadata..createdAt', 'metadata.createdAt,'])
+def test_invalid_fields_are_rejected(client, account_id, fields):
+    response = client.get(f"/accounts/{account_id}/transactions", query_string={'fields': fields})
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Invalid fields parameter')
+
+def test_columnar_format_has_a_column_per_field(client, account_id):
+    url = f"/accounts/{account_id}/transactions?per_page=5"
+    whole = client.get(url).get_json()['transactions']
+
+    response = client.get(f"{url}&fields=metadata.createdAt,payload.booked.transactionId",
+                          headers={'Accept': 'application/vnd.transaction-api.columnar+json'})
+    body = response.get_json(force=True)
+
+    assert response.mimetype == 'application/vnd.transaction-api.columnar+json'
+    assert 'Accept' in response.headers['Vary']
+    assert body['fields'] == ['metadata.createdAt', 'payload.booked.transactionId']
+    assert body['columns'] == {
+        'metadata.createdAt': [record['metadata']['createdAt'] for record in whole],
+        'payload.booked.transactionId': [
+            [tx['transactionId'] for tx in record['payload']['booked']] for record in whole
+        ],
+    }
+    assert 'transactions' not in body
+
+def test_msgpack_format_encodes_the_json_document(client, account_id):
+    msgpack = pytest.importorskip('msgpack')
+    url = f"/accounts/{account_id}/transactions?per_page=5"
+    document = client.get(url).get_json()
+
+    response = client.get(url, headers={'Accept': 'application/msgpack'})
+
+    assert response.mimetype == 'application/msgpack'
+    assert without_timestamp(msgpack.unpackb(response.get_data())) == without_timestamp(document)
+
+def test_etag_differs_per_format(client, account_id):
+    url = f"/accounts/{account_id}/transactions"
+    etag = client.get(url).headers['ETag']
+
+    response = client.get(url, headers={'If-None-Match': etag, 'Accept': 'application/vnd.transaction-api.columnar+json'})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_accounts_without_pagination_lists_every_account(client):
+    body = client.get('/accounts').get_json()
+
+    assert body['accounts'] == api.data_generation.account_ids
+    assert body['total_count'] == len(api.data_generation.account_ids) == 10
+
+def test_accounts_pages_cover_every_account_once(client):
+    accounts, page = [], 1
+    while True:
+        body = client.get(f"/accounts?page={page}&per_page=3").get_json()
+        accounts.extend(body['accounts'])
+        if not body['pagination']['has_next']:
+            break
+        page += 1
+
+    assert accounts == api.data_generation.account_ids
+    assert body['pagination']['total_pages'] == page == 4
+
+def test_accounts_cursor_resumes_after_the_last_account(client):
+    accounts, cursor = [], ''
+    while cursor is not None:
+        body = client.get('/accounts', query_string={'after': cursor, 'per_page': 4}).get_json()
+        accounts.extend(body['accounts'])
+        cursor = body['pagination']['next_cursor']
+
+    assert accounts == api.data_generation.account_ids
+
+def test_accounts_page_beyond_the_end_is_not_found(client):
+    response = client.get('/accounts?page=5&per_page=3')
+
+    assert response.status_code == 404
+    assert response.get_json()['error'] == 'Page 5 is beyond available data'
+
+@pytest.mark.parametrize('route', ['transactions', 'summary'])
+def test_unknown_account_is_not_found(client, route):
+    response = client.get(f"/accounts/invalid-account-id/{route}")
+
+    assert response.status_code == 404
+    assert response.get_json()['error'] == 'Account not found: invalid-account-id'
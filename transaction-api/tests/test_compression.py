@@ -0,0 +1,62 @@
+"""Spliced and streamed response compression must decode to the identity body"""
+
+import gzip
+import zlib
+
+import pytest
+
+from compression import PageCompressor, available_encodings, compress, iter_compressed
+
+HEAD = b'{"account_id":"acc-a","pagination":{"page":1},"transactions":['
+ITEMS = b','.join(b'{"id":%d,"amount":"-%d.50","ref":"REF %08d"}' % (i, i, i * 7919) for i in range(500))
+TAIL = b']}\n'
+
+def decode(body: bytes, encoding: str) -> bytes:
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    zstandard = pytest.importorskip('zstandard')
+    # Spliced zstd bodies hold several frames
+    return zstandard.ZstdDecompressor().stream_reader(body, read_across_frames=True).read()
+
+@pytest.mark.parametrize('encoding', available_encodings())
+def test_spliced_page_decodes_to_identity(encoding):
+    compressor = PageCompressor(max_bytes=1 << 20)
+
+    first = compressor.compress_page(('acc-a', 0, 500), HEAD, memoryview(ITEMS), TAIL, encoding)
+    # Second request for the page: cached segment, different head
+    other_head = HEAD.replace(b'"page":1', b'"page":1,"timestamp":"2025-07-19T21:24:04"')
+    second = compressor.compress_page(('acc-a', 0, 500), other_head, memoryview(ITEMS), TAIL, encoding)
+
+    assert decode(first, encoding) == HEAD + ITEMS + TAIL
+    assert decode(second, encoding) == other_head + ITEMS + TAIL
+    assert compressor.stats()['hits'] == 1
+    assert compressor.stats()['misses'] == 1
+
+@pytest.mark.parametrize('encoding', available_encodings())
+def test_spliced_page_with_empty_items(encoding):
+    body = PageCompressor(max_bytes=1 << 20).compress_page(('acc-a', 9, 9), HEAD, memoryview(b''), TAIL, encoding)
+
+    assert decode(body, encoding) == HEAD + TAIL
+
+def test_gzip_trailer_matches_spliced_content():
+    body = PageCompressor(max_bytes=1 << 20).compress_page(('acc-a',), HEAD, memoryview(ITEMS), TAIL, 'gzip')
+
+    # Strict decoders check the CRC and size in the trailer
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decompressor.decompress(body) == HEAD + ITEMS + TAIL
+    assert decompressor.eof and not decompressor.unused_data
+
+def test_segments_larger_than_the_cache_are_not_kept():
+    compressor = PageCompressor(max_bytes=16)
+
+    body = compressor.compress_page(('acc-a',), HEAD, memoryview(ITEMS), TAIL, 'gzip')
+
+    assert gzip.decompress(body) == HEAD + ITEMS + TAIL
+    assert compressor.stats()['entries'] == 0
+
+@pytest.mark.parametrize('encoding', available_encodings())
+def test_whole_and_streamed_bodies_decode_to_identity(encoding):
+    chunks = [ITEMS[i:i + 1000] for i in range(0, len(ITEMS), 1000)]
+
+    assert decode(compress(ITEMS, encoding), encoding) == ITEMS
+    assert decode(b''.join(iter_compressed(iter(chunks), encoding)), encoding) == ITEMS
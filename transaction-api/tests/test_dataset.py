@@ -0,0 +1,180 @@
+"""Loading exports into the section layout, data directories and snapshot round-trips"""
+
+import os
+import json
+from decimal import Decimal
+from typing import Any, Dict
+
+import pytest
+
+from dataset import (
+    DatasetCollection, build_dataset, iter_transaction_records, load_dataset, open_snapshot, write_snapshot
+)
+
+def contents(dataset) -> Dict[str, Any]:
+    """Everything the API serves from a dataset, per account"""
+    view = {}
+    for account_id in dataset.account_ids:
+        store = dataset.accounts[account_id]
+        view[account_id] = {
+            'records': bytes(store.page_bytes(0, len(store))),
+            'created_at': list(store.created_at),
+            'ledger': bytes(store.ledger.page_bytes(0, len(store.ledger))),
+            'balances': {currency: series.as_of() for currency, series in store.balances.items()},
+            'transactions': store.transactions.match(),
+            'digest': store.digest,
+            'summary': dataset.summaries[account_id]
+        }
+    return view
+
+def test_records_are_grouped_by_account_and_sorted(tmp_path, records, write_json):
+    dataset = build_dataset(write_json(str(tmp_path / 'transactions.json'), records))
+
+    assert dataset.account_ids == ['acc-a', 'acc-b', 'acc-c']
+    assert dataset.total_records == len(records)
+    store = dataset.accounts['acc-b']
+    assert list(store.created_at) == ['2025-07-01T09:00:00.000Z', '2025-07-02T09:00:00.000Z']
+    page = json.loads(b'[' + bytes(store.page_bytes(0, len(store))) + b']')
+    assert [record['metadata']['createdAt'] for record in page] == list(store.created_at)
+
+@pytest.mark.parametrize('filename', ['transactions.ndjson', 'transactions.jsonl', 'transactions.ndjson.gz'])
+def test_ndjson_loads_like_json(tmp_path, records, write_json, write_ndjson, filename):
+    expected = build_dataset(write_json(str(tmp_path / 'transactions.json'), records))
+    dataset = build_dataset(write_ndjson(str(tmp_path / filename), records))
+
+    assert dataset.source_format == 'ndjson'
+    assert contents(dataset) == contents(expected)
+    assert dataset.digest == expected.digest
+
+def test_zstd_export_with_several_frames_loads_like_json(tmp_path, records, write_json):
+    zstandard = pytest.importorskip('zstandard')
+    expected = build_dataset(write_json(str(tmp_path / 'transactions.json'), records))
+
+    # One frame per append, as the anonymizer writes it
+    path = str(tmp_path / 'transactions.ndjson.zst')
+    with open(path, 'wb') as f:
+        for record in records:
+            f.write(zstandard.ZstdCompressor().compress(json.dumps(record).encode('utf-8') + b'\n'))
+
+    assert contents(build_dataset(path)) == contents(expected)
+
+def test_small_read_chunks_give_the_same_records(tmp_path, records, write_json):
+    path = write_json(str(tmp_path / 'transactions.json'), records)
+
+    assert list(iter_transaction_records(path, chunk_size=7)) == records
+
+def test_empty_array_loads_no_accounts(tmp_path, write_json):
+    dataset = build_dataset(write_json(str(tmp_path / 'transactions.json'), []))
+
+    assert dataset.account_ids == []
+    assert dataset.total_records == 0
+
+@pytest.mark.parametrize('cut', [
+    lambda text: text[:len(text) // 2],          # Inside a record
+    lambda text: text.rstrip()[:-1],             # Closing bracket missing
+    lambda text: text.rstrip()[:-1] + ',',       # Dangling comma
+])
+def test_truncated_json_array_is_rejected(tmp_path, records, cut):
+    path = tmp_path / 'transactions.json'
+    path.write_text(cut(json.dumps(records, indent=2)), encoding='utf-8')
+
+    with pytest.raises(json.JSONDecodeError):
+        build_dataset(str(path), chunk_size=64)
+
+def test_truncated_ndjson_line_is_rejected(tmp_path, records):
+    text = ''.join(json.dumps(record) + '\n' for record in records)
+    path = tmp_path / 'transactions.ndjson'
+    path.write_text(text[:-20], encoding='utf-8')
+
+    with pytest.raises(json.JSONDecodeError):
+        build_dataset(str(path))
+
+def test_data_directory_with_mixed_formats(tmp_path, records, write_json, write_ndjson):
+    expected = build_dataset(write_json(str(tmp_path / 'all.json'), records))
+
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    by_account = {}
+    for record in records:
+        by_account.setdefault(record['metadata']['accountId'], []).append(record)
+    write_json(str(data_dir / 'a.json'), by_account['acc-a'])
+    write_ndjson(str(data_dir / 'b.ndjson.gz'), by_account['acc-b'])
+    write_snapshot(build_dataset(write_json(str(tmp_path / 'c.json'), by_account['acc-c'])), str(data_dir / 'c.snapshot'))
+    (data_dir / 'notes.txt').write_text('not transaction data')
+
+    collection = load_dataset(str(data_dir))
+
+    assert isinstance(collection, DatasetCollection)
+    assert collection.source_format == 'mixed'
+    assert contents(collection) == contents(expected)
+    assert collection.digest == expected.digest
+    assert collection.summary == expected.summary
+
+def test_directory_reload_reparses_only_changed_files(tmp_path, records, write_json, write_ndjson):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    a_path = write_json(str(data_dir / 'a.json'), [r for r in records if r['metadata']['accountId'] == 'acc-a'])
+    b_path = write_ndjson(str(data_dir / 'b.ndjson'), [r for r in records if r['metadata']['accountId'] == 'acc-b'])
+    first = load_dataset(str(data_dir))
+
+    write_ndjson(b_path, [r for r in records if r['metadata']['accountId'] == 'acc-b'][:1])
+    os.utime(b_path, ns=(0, 0))
+    second = load_dataset(str(data_dir), previous=first)
+
+    assert second.reparsed == [b_path]
+    assert second.parts[a_path][1] is first.parts[a_path][1]
+    assert len(second.accounts['acc-b']) == 1
+
+def test_account_split_across_files_is_rejected(tmp_path, records, write_json, write_ndjson):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    account_b = [r for r in records if r['metadata']['accountId'] == 'acc-b']
+    write_json(str(data_dir / 'first.json'), account_b[:1])
+    write_ndjson(str(data_dir / 'second.ndjson'), account_b[1:])
+
+    with pytest.raises(ValueError, match='acc-b appears in more than one data file'):
+        load_dataset(str(data_dir))
+
+def test_balances_sum_each_booked_transaction_once(tmp_path, records, write_json):
+    dataset = build_dataset(write_json(str(tmp_path / 'transactions.json'), records))
+
+    def points(account_id):
+        series = dataset.accounts[account_id].balances['GBP']
+        return series.scale, list(zip(series.dates, series.totals))
+
+    assert points('acc-a') == (2, [(20250701, -461), (20250703, 149539)])
+    # b1 is booked in both records of acc-b but counted once
+    assert points('acc-b') == (2, [(20250701, -1250), (20250702, 8750)])
+    assert points('acc-c') == (3, [(20250704, 5), (20250705, -5)])
+    assert dataset.accounts['acc-c'].balances['GBP'].as_of(20250704) == (Decimal('0.005'), 20250704)
+
+def test_balance_day_falls_back_to_value_date(tmp_path, make_record, write_json):
+    record = make_record('acc-a', '2025-07-03T08:00:00.000Z', booked=[('a1', '-4.61', '2025-07-01', 'POS'),
+                                                                     ('a2', 'n/a', '2025-07-02', 'POS')])
+    del record['payload']['booked'][0]['bookingDate']
+    record['payload']['booked'][0]['valueDate'] = '2025-06-30'
+    dataset = build_dataset(write_json(str(tmp_path / 'transactions.json'), [record]))
+
+    series = dataset.accounts['acc-a'].balances['GBP']
+    assert list(zip(series.dates, series.totals)) == [(20250630, -461)]
+
+def test_snapshot_round_trip(tmp_path, records, write_json):
+    built = build_dataset(write_json(str(tmp_path / 'transactions.json'), records))
+    path = str(tmp_path / 'transactions.snapshot')
+    write_snapshot(built, path)
+
+    for opened in (open_snapshot(path), load_dataset(path)):
+        assert opened.source_format == 'snapshot'
+        assert opened.account_index == built.account_index
+        assert contents(opened) == contents(built)
+        assert opened.digest == built.digest
+        assert opened.summary == built.summary
+        for name, section in built.sections.items():
+            assert bytes(opened.sections[name]) == bytes(section), name
+
+def test_snapshot_with_wrong_magic_is_rejected(tmp_path):
+    path = tmp_path / 'transactions.snapshot'
+    path.write_bytes(b'NOTSNAP!' + bytes(64))
+
+    with pytest.raises(ValueError, match='Not a transaction snapshot'):
+        open_snapshot(str(path))
@@ -0,0 +1,30 @@
+"""Bundled fault profiles must fit inside the server's limits"""
+
+import os
+import re
+import json
+
+import pytest
+
+from faults import load_profile
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES_PATH = os.path.join(API_DIR, 'fault_profiles.json')
+
+def worker_timeout() -> float:
+    """gunicorn --timeout from the Dockerfile"""
+    with open(os.path.join(API_DIR, 'Dockerfile'), encoding='utf-8') as f:
+        return float(re.search(r'"--timeout",\s*"(\d+)"', f.read()).group(1))
+
+with open(PROFILES_PATH, encoding='utf-8') as f:
+    PROFILE_NAMES = sorted(json.load(f))
+
+@pytest.mark.parametrize('name', PROFILE_NAMES)
+def test_worst_case_delay_is_below_the_worker_timeout(name):
+    profile = load_profile(PROFILES_PATH, name)
+    spec = profile.latency_spec
+    # Capped distributions only; an uncapped tail could hang past any timeout
+    latency = spec['seconds'] if spec['distribution'] == 'fixed' else spec['max']
+
+    # A sync worker sleeps through the latency and the stall back to back
+    assert latency + profile.stall_seconds < worker_timeout()
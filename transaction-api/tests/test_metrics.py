@@ -0,0 +1,47 @@
+"""Cross-process metric files: merging and starting each run from zero"""
+
+import os
+import importlib.util
+
+import metrics
+
+def counter_total(registry, name):
+    return sum(values[0] for values in registry.collect().get(name, {}).values())
+
+def test_counters_from_exited_processes_are_summed(tmp_path):
+    registry = metrics.MetricsRegistry(str(tmp_path))
+    requests = registry.counter('requests_total', 'Requests', ['route'])
+    requests.inc(route='/health')
+
+    # A store left by a worker that has since exited
+    stale = metrics.ProcessStore(str(tmp_path / 'metrics-999999999.bin'))
+    stale.add(stale.offset(requests._key({'route': '/health'}), 1), 41)
+    stale.close()
+
+    assert counter_total(registry, 'requests_total') == 42
+
+def test_clear_directory_removes_only_store_files(tmp_path):
+    store = metrics.ProcessStore(str(tmp_path / 'metrics-1.bin'))
+    store.close()
+    (tmp_path / 'notes.txt').write_text('kept')
+
+    metrics.clear_directory(str(tmp_path))
+
+    assert os.listdir(tmp_path) == ['notes.txt']
+
+def test_gunicorn_start_hook_resets_totals_of_the_previous_run(tmp_path, monkeypatch):
+    registry = metrics.MetricsRegistry(str(tmp_path))
+    requests = registry.counter('requests_total', 'Requests')
+    previous_run = metrics.ProcessStore(str(tmp_path / 'metrics-999999999.bin'))
+    previous_run.add(previous_run.offset(requests._key({}), 1), 5)
+    previous_run.close()
+    assert counter_total(registry, 'requests_total') == 5
+
+    monkeypatch.setenv('METRICS_DIR', str(tmp_path))
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', config_path)
+    config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config)
+    config.on_starting(None)
+
+    assert counter_total(registry, 'requests_total') == 0
@@ -0,0 +1,35 @@
+"""Token buckets shared through the mmap'd state file"""
+
+import math
+
+import pytest
+
+from ratelimit import TokenBucketLimiter
+
+def test_bucket_allows_its_capacity_then_reports_retry_after(tmp_path):
+    limiter = TokenBucketLimiter(str(tmp_path / 'state.bin'), capacity=2, refill_rate=0.5)
+
+    decisions = [limiter.acquire('client-a') for _ in range(3)]
+
+    assert [decision.allowed for decision in decisions] == [True, True, False]
+    assert 0 < decisions[-1].retry_after <= 2.0
+    assert 0 < decisions[-1].reset_after <= 4.0
+    assert limiter.acquire('client-b').allowed
+
+def test_buckets_are_shared_through_the_state_file(tmp_path):
+    path = str(tmp_path / 'state.bin')
+    first = TokenBucketLimiter(path, capacity=1, refill_rate=0.001)
+    second = TokenBucketLimiter(path, capacity=1, refill_rate=0.001)
+
+    assert first.acquire('client-a').allowed
+    assert not second.acquire('client-a').allowed
+
+@pytest.mark.parametrize('refill_rate', [0, -1.0, math.nan])
+def test_non_positive_refill_rate_is_rejected(tmp_path, refill_rate):
+    with pytest.raises(ValueError, match='refill rate must be positive'):
+        TokenBucketLimiter(str(tmp_path / 'state.bin'), capacity=10, refill_rate=refill_rate)
+
+@pytest.mark.parametrize('capacity', [0, -5])
+def test_capacity_below_one_is_rejected(tmp_path, capacity):
+    with pytest.raises(ValueError, match='capacity must be at least 1'):
+        TokenBucketLimiter(str(tmp_path / 'state.bin'), capacity=capacity, refill_rate=1.0)